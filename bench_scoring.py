@@ -0,0 +1,187 @@
+# bench_scoring.py — loop vs batch scoring (and question dedupe) for growing candidate pools
+#   python bench_scoring.py [max_candidates]
+# The synthetic generators here are shared with bench_workflow.py.
+import json, math, random, sys, time, tracemalloc
+
+from local_tools import HAVE_NUMPY, compute_scores_locally, dedupe_questions_locally
+
+SKILLS = [
+    "Python", "Java", "Go", "Rust", "JS", "TS", "Node", "Django", "FastAPI", "Spring",
+    "Postgres", "PostgreSQL", "MySQL", "Redis", "Kafka", "K8s", "Kubernetes", "AWS", "GCP",
+    "gRPC", "Distributed systems", "Terraform", "Docker", "Airflow", "Spark",
+]
+
+criteria = {
+    "role": "Senior Backend Engineer",
+    "must_haves": ["Python", "Distributed systems", "PostgreSQL"],
+    "nice_to_haves": ["Kubernetes", "AWS", "gRPC"],
+    "weights": {"must_haves": 0.6, "nice_to_haves": 0.2, "experience": 0.2},
+}
+
+def synthetic_evidence(count, seed=0):
+    rng = random.Random(seed)
+    evidence = []
+    for i in range(count):
+        evidence.append({
+            "name": f"Candidate {i}",
+            "skills": rng.sample(SKILLS, rng.randint(2, 10)),
+            "experience": [{"role": "backend", "years": rng.randint(0, 6)} for _ in range(rng.randint(0, 3))],
+        })
+    return {"evidence": evidence}
+
+def synthetic_resumes(count, seed=0):
+    # resume text in the "skill, skill, Ny role" style fake_julep.fake_extract understands
+    rng = random.Random(seed)
+    for i in range(count):
+        parts = rng.sample(SKILLS, rng.randint(2, 10))
+        parts += [f"{rng.randint(1, 9)}y {rng.choice(('backend', 'platform', 'data'))}" for _ in range(rng.randint(0, 2))]
+        rng.shuffle(parts)
+        yield {"name": f"Candidate {i}", "text": ", ".join(parts) + "."}
+
+QUESTION_TEMPLATES = [
+    "How did you use {s} in production?",
+    "How have you used {s} in production systems?",
+    "Walk me through a hard {s} bug you fixed.",
+    "What trade-offs did you weigh when adopting {s}?",
+    "Describe how you scaled a service built on {s}.",
+]
+
+def synthetic_questions(count, per_candidate=8, seed=0):
+    # top_n_questions JSON with paraphrases, exact repeats and cross-candidate overlap
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        qs = [rng.choice(QUESTION_TEMPLATES).format(s=rng.choice(SKILLS)) for _ in range(per_candidate)]
+        qs.append(qs[0])
+        items.append({"name": f"Candidate {i}", "questions": qs})
+    return json.dumps({"top_n_questions": items})
+
+def percentile(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, max(0, math.ceil(p * len(xs)) - 1))] if xs else 0.0
+
+def profile(fn, repeat=5):
+    # -> {"p50_ms", "p95_ms", "p99_ms", "peak_kb"}; peak memory is taken on one extra run
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "p50_ms": percentile(times, 0.5) * 1e3, "p95_ms": percentile(times, 0.95) * 1e3,
+        "p99_ms": percentile(times, 0.99) * 1e3, "peak_kb": peak / 1024,
+    }
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def main(max_candidates=100_000):
+    print(f"{'candidates':>10} {'loop ms':>10} {'batch ms':>10} {'speedup':>8}  identical")
+    count = 10
+    while count <= max_candidates:
+        ev = synthetic_evidence(count)
+        t_loop, loop_out = timed(lambda: compute_scores_locally(criteria, ev, 5))
+        t_batch, batch_out = timed(lambda: compute_scores_locally(criteria, ev, 5, batch=True))
+        same = loop_out == batch_out
+        print(f"{count:>10} {t_loop * 1e3:>10.2f} {t_batch * 1e3:>10.2f} {t_loop / t_batch:>7.1f}x  {same}")
+        count *= 10
+
+    if HAVE_NUMPY:
+        bench_rerank(max_candidates)
+        bench_store(max_candidates)
+    bench_sharded(max_candidates)
+    bench_profiles(max_candidates)
+
+def bench_profiles(max_candidates, repeat=5):
+    # latency percentiles and peak traced memory for the local tools as pools grow
+    print(f"{'function':<28} {'candidates':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KB':>10} {'cand/s':>10}")
+    count = 10
+    while count <= max_candidates:
+        ev = synthetic_evidence(count)
+        runs = [("compute_scores_locally", lambda: compute_scores_locally(criteria, ev, 5))]
+        if HAVE_NUMPY:
+            runs.append(("  batch=True", lambda: compute_scores_locally(criteria, ev, 5, batch=True)))
+        if count <= 10_000:  # question pools past 10k take minutes per run
+            qs = synthetic_questions(count)
+            runs.append(("dedupe_questions_locally", lambda: dedupe_questions_locally(qs)))
+            runs.append(("  across_candidates=True", lambda: dedupe_questions_locally(qs, across_candidates=True)))
+        for name, fn in runs:
+            p = profile(fn, repeat if count < 100_000 else 2)
+            rate = count / (p["p50_ms"] / 1e3) if p["p50_ms"] else float("inf")
+            print(f"{name:<28} {count:>10} {p['p50_ms']:>9.2f} {p['p95_ms']:>9.2f} {p['p99_ms']:>9.2f} "
+                  f"{p['peak_kb']:>10.0f} {rate:>10.0f}")
+        count *= 10
+
+def bench_rerank(count, edits=20):
+    # criteria tweaks on an already-encoded pool (ranking.IncrementalRanker)
+    from ranking import IncrementalRanker
+    ev = synthetic_evidence(count)
+    t0 = time.perf_counter()
+    ranker = IncrementalRanker(criteria, ev)
+    build = time.perf_counter() - t0
+    rng = random.Random(1)
+    times = []
+    for _ in range(edits):
+        must = rng.sample(SKILLS, 3)
+        weights = {"must_haves": rng.random(), "nice_to_haves": rng.random(), "experience": rng.random()}
+        t0 = time.perf_counter()
+        ranker.update(must_haves=must, weights=weights)
+        ranker.top(5)
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    print(f"re-rank {count} candidates: build {build * 1e3:.1f} ms, "
+          f"update+top5 median {times[len(times) // 2] * 1e3:.2f} ms, max {times[-1] * 1e3:.2f} ms")
+
+def bench_store(count, queries=20):
+    # talent-pool search and whole-pool scoring (candidate_store.CandidateStore)
+    import os, tempfile
+    from candidate_store import CandidateStore
+    ev = synthetic_evidence(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CandidateStore(os.path.join(tmp, "candidates.sqlite"))
+        t0 = time.perf_counter()
+        store.add(ev["evidence"])
+        build = time.perf_counter() - t0
+        rng = random.Random(2)
+        times = []
+        for _ in range(queries):
+            skills, years = rng.sample(SKILLS, rng.randint(1, 3)), rng.choice((None, 3, 5))
+            t0 = time.perf_counter()
+            store.search(skills, min_years=years)
+            times.append(time.perf_counter() - t0)
+        times.sort()
+        cold, out = timed(lambda: store.score(criteria, 5), repeat=1)
+        warm, _ = timed(lambda: store.score(criteria, 5))
+        same = out == compute_scores_locally(criteria, ev, 5, batch=True, top_only=True)
+        store.close()
+    print(f"candidate store {count}: add {build * 1e3:.0f} ms, search median {times[len(times) // 2] * 1e3:.2f} ms, "
+          f"max {times[-1] * 1e3:.2f} ms; pool top5 cold {cold * 1e3:.1f} ms, warm {warm * 1e3:.1f} ms, identical {same}")
+
+def bench_sharded(count, max_workers=None):
+    # one process vs sharded_scoring with 1, 2, 4, ... workers (up to the CPU count, at
+    # least 4), top-5 of the same pool
+    import os
+    from sharded_scoring import compute_scores_sharded
+    max_workers = max_workers or max(4, os.cpu_count() or 1)
+    ev = synthetic_evidence(count)
+    single, ref = timed(lambda: compute_scores_locally(criteria, ev, 5, batch=HAVE_NUMPY, top_only=True), repeat=1)
+    print(f"sharded scoring {count}: 1 process {single * 1e3:.0f} ms ({os.cpu_count()} CPUs)")
+    workers = 1
+    while workers <= max_workers:
+        sharded, out = timed(lambda: compute_scores_sharded(criteria, ev, 5, workers=workers, min_shard=1), repeat=1)
+        print(f"{workers:>10} workers {sharded * 1e3:>8.0f} ms ({single / sharded:.1f}x), identical {out == ref}")
+        workers *= 2
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,91 @@
+# bench_workflow.py — the full Task A -> Task B flow against fake_julep.FakeJulep
+#   python bench_workflow.py [--requisitions 1,10,50] [--resumes 200] [--step-latency 0.05]
+#
+# Same task definitions, scheduler and local tools as main_code.py; only the backend is
+# simulated (per-step latencies, scripted awaiting_input pauses, API call latency), so it
+# costs no LLM calls. Reports throughput, per-requisition latency percentiles, peak
+# traced memory and API calls per requisition.
+import argparse, time, tracemalloc
+
+from bench_scoring import criteria, percentile, synthetic_resumes
+from fake_julep import FakeJulep
+from registry import Registry
+from scheduler import ExecutionScheduler
+from task_definitions import extract_task, rank_task
+from waiting import WaitStrategy
+
+def make_backend(step_latency, api_latency, pauses, failure_rate=0.0):
+    client = FakeJulep(
+        step_latency={"evidence_json": step_latency, "questions_json": step_latency, "default": 0.0},
+        api_latency=api_latency, pauses=pauses, failure_rate=failure_rate, seed=0,
+    )
+    registry = Registry(client, cache_path=None)
+    extractor = registry.agent("ExtractorAgent", about="bench")
+    orchestrator = registry.agent("OrchestratorAgent", about="bench")
+    return client, registry.task(extractor.id, extract_task).id, registry.task(orchestrator.id, rank_task).id
+
+def run_flow(requisitions, resumes, step_latency=0.05, api_latency=0.0, pauses=None,
+             max_concurrency=8, token_budget=1500, failure_rate=0.0):
+    client, extract_id, rank_id = make_backend(step_latency, api_latency, pauses, failure_rate)
+    reqs = [
+        {"criteria": criteria, "resumes": synthetic_resumes(resumes, seed=i), "n": 5}
+        for i in range(requisitions)
+    ]
+    # polls scaled to the simulated step time rather than the real backend's seconds
+    wait = WaitStrategy(initial=max(step_latency / 4, 0.001), cap=max(step_latency, 0.002),
+                        fast_interval=max(step_latency / 8, 0.001), jitter=0.0)
+    latencies, errors = [], 0
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        with ExecutionScheduler(client, max_concurrency=max_concurrency, wait_strategy=wait,
+                                log=lambda *a: None) as scheduler:
+            for _, res in scheduler.run_requisitions(extract_id, rank_id, reqs, token_budget=token_budget):
+                # from the requisition's own first submission, not the start of the whole run
+                latencies.append(time.perf_counter() - (res["started"] or t0))
+                errors += res["error"] is not None
+        wall = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    calls = sum(v for k, v in client.calls.items() if k.startswith("executions."))
+    return {
+        "requisitions": requisitions,
+        "resumes": requisitions * resumes,
+        "wall_s": wall,
+        "req_per_s": requisitions / wall,
+        "resumes_per_s": requisitions * resumes / wall,
+        "p50_s": percentile(latencies, 0.5),
+        "p95_s": percentile(latencies, 0.95),
+        "p99_s": percentile(latencies, 0.99),
+        "peak_mb": peak / 2 ** 20,
+        "api_calls_per_req": calls / requisitions,
+        "errors": errors,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--requisitions", default="1,10,50", help="comma-separated requisition counts")
+    ap.add_argument("--resumes", type=int, default=200, help="resumes per requisition")
+    ap.add_argument("--step-latency", type=float, default=0.05, help="seconds per LLM step")
+    ap.add_argument("--api-latency", type=float, default=0.0, help="seconds per API call")
+    ap.add_argument("--pauses", type=int, default=1, help="awaiting_input polls before the questions appear")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--token-budget", type=int, default=1500)
+    ap.add_argument("--failure-rate", type=float, default=0.0)
+    args = ap.parse_args()
+
+    print(f"{'reqs':>5} {'resumes':>8} {'wall s':>8} {'req/s':>7} {'resumes/s':>10} "
+          f"{'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'peak MB':>8} {'calls/req':>9} {'errors':>6}")
+    for count in (int(c) for c in args.requisitions.split(",") if c):
+        r = run_flow(
+            count, args.resumes, args.step_latency, args.api_latency,
+            {"questions_json": args.pauses} if args.pauses else None,
+            args.concurrency, args.token_budget, args.failure_rate,
+        )
+        print(f"{r['requisitions']:>5} {r['resumes']:>8} {r['wall_s']:>8.2f} {r['req_per_s']:>7.2f} "
+              f"{r['resumes_per_s']:>10.0f} {r['p50_s']:>7.2f} {r['p95_s']:>7.2f} {r['p99_s']:>7.2f} "
+              f"{r['peak_mb']:>8.1f} {r['api_calls_per_req']:>9.1f} {r['errors']:>6}")
+
+if __name__ == "__main__":
+    main()
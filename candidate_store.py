@@ -0,0 +1,222 @@
+# candidate_store.py — every candidate ever extracted, searchable across requisitions
+#
+# SQLite, like evidence_cache.py, but one row per candidate rather than per prompt version:
+#   candidates(id, key, name, exp_years, evidence)  one row per candidate, upserted by key:
+#                                                     the resume id Task A echoed (a hash of
+#                                                     the resume text, or the ingestion path),
+#                                                     never the name, which people share
+#   skills(skill, candidate)                          inverted index, normalized lowercase skill
+#                                                     -> candidate ids (clustered, WITHOUT ROWID)
+# search(["Python", "PostgreSQL"], min_years=5) intersects the posting lists in SQL, rarest
+# skill first, so it never reads evidence. score(criteria, n) ranks the whole pool for a new requisition from
+# the index alone: the skill matrix is built from the postings (cached until the next add),
+# and the result is the same top-N compute_scores_locally gives on the stored evidence.
+import hashlib, json, sqlite3, threading, time
+
+from llm_json import dumps, loads
+from local_tools import (
+    SkillMatrix, _experience_years, compute_scores_locally, normalize_term, np, top_from_matrix,
+)
+
+def candidate_key(item):
+    # an item without an id is keyed by a hash of its own evidence
+    if item.get("id") is not None:
+        return f"id:{item['id']}"
+    blob = json.dumps(item, sort_keys=True, ensure_ascii=False)
+    return "ev:" + hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+def skill_key(skill):
+    # same key encode_evidence / iter_scored compare on
+    return normalize_term(skill).lower()
+
+class CandidateStore:
+    def __init__(self, path):
+        self.path = path
+        self.searches = 0
+        self.search_seconds = 0.0
+        self._matrix = None
+        self._skill_counts = None
+        self._version = 0  # bumped by every write, so a matrix built meanwhile isn't kept
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            " id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, name TEXT NOT NULL,"
+            " exp_years REAL NOT NULL, evidence TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS candidates_exp ON candidates(exp_years)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS skills ("
+            " skill TEXT NOT NULL, candidate INTEGER NOT NULL, PRIMARY KEY (skill, candidate)"
+            ") WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS skills_candidate ON skills(candidate)")
+        self._db.commit()
+
+    def add(self, items):
+        # upsert evidence items (matched by candidate_key); a candidate's postings are
+        # replaced, and it keeps its id, so pool order is the order candidates were first seen
+        latest = {}
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("name"), str) and item["name"].strip():
+                latest[candidate_key(item)] = item
+        if not latest:
+            return 0
+        now = time.time()
+        rows = [
+            (key, item["name"], _experience_years(item), dumps(item), now)
+            for key, item in latest.items()
+        ]
+        keys = list(latest)
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO candidates (key, name, exp_years, evidence, updated) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET name = excluded.name, exp_years = excluded.exp_years,"
+                " evidence = excluded.evidence, updated = excluded.updated",
+                rows,
+            )
+            ids = {}
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                ids.update(self._db.execute(
+                    f"SELECT key, id FROM candidates WHERE key IN ({','.join('?' * len(chunk))})", chunk,
+                ).fetchall())
+            self._db.executemany("DELETE FROM skills WHERE candidate = ?", [(i,) for i in ids.values()])
+            self._db.executemany(
+                "INSERT OR IGNORE INTO skills VALUES (?, ?)",
+                [
+                    (skill_key(s), ids[key])
+                    for key, item in latest.items()
+                    for s in item.get("skills") or []
+                    if isinstance(s, str)
+                ],
+            )
+            self._db.commit()
+            self._matrix = self._skill_counts = None
+            self._version += 1
+        return len(rows)
+
+    def _counts(self):
+        # skill -> posting count, cached until the next write (called with the lock held)
+        if self._skill_counts is None:
+            self._skill_counts = dict(self._db.execute("SELECT skill, COUNT(*) FROM skills GROUP BY skill"))
+        return self._skill_counts
+
+    def search(self, skills=(), min_years=None, limit=None):
+        # candidates having every skill (after normalization) and at least min_years
+        # -> [{"id", "name", "exp_years"}] in pool order. Walks the rarest skill's postings
+        # and probes the others' (skill, candidate) primary key for each.
+        t0 = time.perf_counter()
+        terms = set(skill_key(s) for s in skills)
+        with self._lock:
+            counts = self._counts()
+            terms = sorted(terms, key=lambda t: counts.get(t, 0))
+            if terms and not counts.get(terms[0]):
+                rows = []
+            else:
+                if terms:
+                    sql = "SELECT c.id, c.name, c.exp_years FROM skills s0"
+                    for k in range(1, len(terms)):
+                        sql += f" JOIN skills s{k} ON s{k}.skill = ? AND s{k}.candidate = s0.candidate"
+                    sql += " CROSS JOIN candidates c ON c.id = s0.candidate WHERE s0.skill = ?"
+                    args = terms[1:] + terms[:1]
+                else:
+                    sql = "SELECT c.id, c.name, c.exp_years FROM candidates c WHERE 1"
+                    args = []
+                if min_years is not None:
+                    sql += " AND c.exp_years >= ?"
+                    args.append(float(min_years))
+                sql += " ORDER BY c.id"
+                if limit is not None:
+                    sql += " LIMIT ?"
+                    args.append(int(limit))
+                rows = self._db.execute(sql, args).fetchall()
+        self.searches += 1
+        self.search_seconds += time.perf_counter() - t0
+        return [{"id": i, "name": name, "exp_years": years} for i, name, years in rows]
+
+    def evidence(self, ids=None, chunk=1000):
+        # stored evidence items in pool order (all of them, or just `ids`), read in chunks
+        if ids is not None:
+            ids = sorted(ids)
+            for start in range(0, len(ids), chunk):
+                part = ids[start:start + chunk]
+                with self._lock:
+                    rows = self._db.execute(
+                        f"SELECT evidence FROM candidates WHERE id IN ({','.join('?' * len(part))}) ORDER BY id", part,
+                    ).fetchall()
+                for (blob,) in rows:
+                    yield loads(blob)
+            return
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT id, evidence FROM candidates WHERE id > ? ORDER BY id LIMIT ?", (last, chunk),
+                ).fetchall()
+            for _, blob in rows:
+                yield loads(blob)
+            if len(rows) < chunk:
+                return
+            last = rows[-1][0]
+
+    def matrix(self):
+        # local_tools.SkillMatrix of the whole pool, built from the index (no evidence parsed)
+        with self._lock:
+            if self._matrix is not None:
+                return self._matrix
+            version = self._version
+            people = self._db.execute("SELECT id, name, exp_years, key FROM candidates ORDER BY id").fetchall()
+            postings = self._db.execute("SELECT candidate, skill FROM skills").fetchall()
+        row_of = {cid: r for r, (cid, _, _, _) in enumerate(people)}
+        vocab = {}
+        rows = np.fromiter((row_of[c] for c, _ in postings), dtype=np.int64, count=len(postings))
+        cols = np.fromiter((vocab.setdefault(s, len(vocab)) for _, s in postings), dtype=np.int64, count=len(postings))
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(len(people) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(people)), out=indptr[1:])
+        matrix = SkillMatrix(
+            vocab, indptr, cols[order],
+            np.asarray([years for _, _, years, _ in people], dtype=np.float64),
+            [name for _, name, _, _ in people],
+            # ranked entries carry the evidence id, as when scoring the items themselves
+            [key[3:] if key.startswith("id:") else None for _, _, _, key in people],
+        )
+        with self._lock:
+            if self._version == version:
+                self._matrix = matrix
+        return matrix
+
+    def score(self, criteria, n, store=None):
+        # top-N of the whole pool for `criteria`, as compute_scores_locally(top_only=True)
+        # would rank the stored evidence; pass a ranking.RankingStore to page the rest
+        if np is None:
+            return compute_scores_locally(criteria, {"evidence": list(self.evidence())}, n, top_only=True, store=store)
+        return top_from_matrix(self.matrix(), criteria, n, store)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM skills")
+            self._db.execute("DELETE FROM candidates")
+            self._db.commit()
+            self._matrix = self._skill_counts = None
+            self._version += 1
+
+    def stats(self):
+        with self._lock:
+            candidates = self._db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+            skills, postings = self._db.execute("SELECT COUNT(DISTINCT skill), COUNT(*) FROM skills").fetchone()
+        return {
+            "candidates": candidates,
+            "skills": skills,
+            "postings": postings,
+            "searches": self.searches,
+            "search_ms_mean": self.search_seconds / self.searches * 1e3 if self.searches else 0.0,
+        }
+
+    def close(self):
+        self._db.close()
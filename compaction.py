@@ -0,0 +1,104 @@
+# compaction.py — shrink the evidence the InterviewerAgent prompt carries
+#
+# Questions are only drafted for the top-N, so the prompt gets just those candidates,
+# empty fields dropped, each candidate capped at a token budget, rendered either as a
+# terse line format or minified JSON. Fields are filled in priority order and long
+# lists are cut with a "+k more" marker rather than dropped outright.
+import json
+
+from extraction import CHARS_PER_TOKEN
+
+FIELD_ORDER = ("skills", "experience", "projects", "education")
+
+def estimate_text_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _experience_str(e):
+    if not isinstance(e, dict):
+        return str(e)
+    role = (e.get("role") or "").strip()
+    years = e.get("years")
+    if isinstance(years, (int, float)) and not isinstance(years, bool):
+        return f"{role} {years:g}y".strip()
+    return role
+
+def _fit(items, budget_chars):
+    # longest prefix of items (rendered as ", "-joined) within budget_chars
+    kept, used = [], 0
+    for s in items:
+        cost = len(s) + 2
+        if used + cost > budget_chars:
+            break
+        kept.append(s)
+        used += cost
+    return kept, used
+
+def compact_candidate(item, scored=None, fmt="lines", token_budget=200):
+    name = item.get("name") or "Unknown"
+    budget = token_budget * CHARS_PER_TOKEN
+    if fmt == "json":
+        out = {"name": name}
+        if scored:
+            out["score"], out["why"] = scored["score"], scored["rationale"]
+    else:
+        header = name + (f" | {scored['score']} ({scored['rationale']})" if scored else "")
+        out = [header]
+    budget -= len(json.dumps(out, separators=(",", ":"), ensure_ascii=False) if fmt == "json" else header)
+
+    for field in FIELD_ORDER:
+        values = [v for v in (item.get(field) or []) if v not in ("", None, {})]
+        if not values or budget <= 0:
+            continue
+        strs = [_experience_str(v) if field == "experience" else str(v).strip() for v in values]
+        strs = [s for s in strs if s]
+        kept, used = _fit(strs, budget - len(field) - 4)
+        if not kept:
+            continue
+        budget -= used + len(field) + 4
+        more = len(strs) - len(kept)
+        if fmt == "json":
+            out[field] = kept + ([f"+{more} more"] if more else [])
+        else:
+            out.append(f"  {field}: {', '.join(kept)}" + (f" (+{more} more)" if more else ""))
+    if fmt == "json":
+        return json.dumps(out, separators=(",", ":"), ensure_ascii=False)
+    return "\n".join(out)
+
+def _key(item):
+    # ranked entries and evidence items carry the resume id when Task A echoed one; two
+    # candidates may share a name
+    if item.get("id") is not None:
+        return ("id", item["id"])
+    return ("name", item.get("name") or "Unknown")
+
+def compact_evidence(ev_list, scored, fmt="lines", token_budget=200, original_json=None):
+    # -> (prompt text for the top_n_names candidates, token stats vs. the old prompt payload)
+    by_key = {}
+    for item in ev_list:
+        by_key.setdefault(_key(item), item)
+    ranked = scored.get("ranked", [])
+    top = ranked[:len(scored.get("top_n_names", []))]
+    parts = [
+        compact_candidate(by_key[_key(r)], r, fmt, token_budget)
+        for r in top if _key(r) in by_key
+    ]
+    text = "\n".join(parts) if fmt == "lines" else "[" + ",".join(parts) + "]"
+
+    # what the prompt used to embed: the full evidence JSON plus compute_scores' full result
+    # (every candidate ranked, then the evidence again). A top-only payload's ranking is
+    # scaled up from its entries to the pool size.
+    if original_json is None:
+        original_json = json.dumps({"evidence": ev_list}, ensure_ascii=False)
+    elif not isinstance(original_json, str):
+        original_json = json.dumps(original_json, ensure_ascii=False)
+    ranked_tokens = estimate_text_tokens(json.dumps(ranked, ensure_ascii=False))
+    total = scored.get("total") or len(ranked)
+    if ranked and total > len(ranked):
+        ranked_tokens = ranked_tokens * total // len(ranked)
+    rest = {"top_n_names": scored.get("top_n_names", []), "evidence": ev_list}
+    before = (
+        estimate_text_tokens(original_json) + ranked_tokens +
+        estimate_text_tokens(json.dumps(rest, ensure_ascii=False))
+    )
+    after = estimate_text_tokens(text)
+    return text, {"tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
@@ -0,0 +1,195 @@
+# dispatch.py — answer awaiting_input pauses from the task definition, not output guessing
+#
+# The task definition is the routing table: each "tool" step index maps to its tool name,
+# and each tool name to a local handler, so any number of tools works. The pending step
+# is read, cheapest first, from
+#   1. a step pointer on the execution itself, when the backend provides one,
+#   2. the saved outputs: the first step whose save_as is not there yet (no API call),
+#   3. the latest transition (one executions.transitions.list call), only when 2 does not
+#      explain the pause: it lands on a non-tool step, or on a step already answered.
+# Each (execution, step) is answered at most once. A stale snapshot that still shows a
+# step we resumed is left alone, and a failed change_status is retried with the payload
+# already computed rather than running the handler again. A pause that no tool step
+# explains for longer than stall_timeout raises instead of polling forever.
+# Handlers are called as handler(exe, arguments); arguments() returns the tool call's
+# arguments, resolved from the saved outputs when the step's argument expressions only
+# reference them, else taken from the step's "wait" transition (the lookup above is
+# reused, so it costs at most one call). None when neither is available.
+import re, threading, time
+
+from tracing import NULL_TRACER, payload_bytes
+
+_OUTPUT_REF = re.compile(r"^\$\s*steps\[(\d+)\]\.output\s*$")
+
+_task_steps = {}
+_task_steps_lock = threading.Lock()
+
+def _field(obj, name):
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+def task_steps(client, task_id):
+    # a task's main steps, fetched once per task id (until forget_task_steps)
+    with _task_steps_lock:
+        steps = _task_steps.get(task_id)
+    if steps is None:
+        task = client.tasks.get(task_id)
+        steps = _field(task, "main") or _field(_field(task, "definition") or {}, "main") or []
+        with _task_steps_lock:
+            _task_steps[task_id] = steps
+    return steps
+
+def forget_task_steps(task_id):
+    # drop a task's cached steps; registry.Registry calls it when it updates a task in place
+    with _task_steps_lock:
+        _task_steps.pop(task_id, None)
+
+def _count(span, key):
+    if span is not None:
+        span.add(key)
+
+def _step_pointer(obj):
+    # index of the step an execution snapshot or transition is on, if it says so. A "wait"
+    # transition is paused on its current step; any other has moved on to its next one.
+    step = _field(obj, "current_step")
+    if step is None:
+        transition = _field(obj, "transition") or obj
+        target = _field(transition, "current")
+        if _field(transition, "type") != "wait" and _field(transition, "next") is not None:
+            target = _field(transition, "next")
+        step = _field(target, "step") if target is not None else None
+    return step if isinstance(step, int) and not isinstance(step, bool) else None
+
+class ToolDispatcher:
+    def __init__(self, handlers, steps, client=None, stall_timeout=600.0, retries=2,
+                 tracer=None, clock=time.monotonic):
+        self.handlers = dict(handlers)
+        self.table = {i: _field(s, "tool") for i, s in enumerate(steps) if _field(s, "tool")}
+        unknown = sorted(set(self.table.values()) - set(self.handlers))
+        if unknown:
+            raise ValueError(f"No tool handler registered for {', '.join(map(repr, unknown))}.")
+        self.save_as = [_field(s, "save_as") for s in steps]
+        self.arguments_spec = [_field(s, "arguments") or {} for s in steps]
+        self.client = client
+        self.stall_timeout = stall_timeout
+        self.retries = retries
+        self.tracer = tracer or NULL_TRACER
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._payloads = {}  # (execution id, step) -> payload computed, not yet accepted
+        self._sent = set()   # (execution id, step) already resumed
+        self._stalled = {}   # execution id -> when an unexplained pause was first seen
+        self._transitions = {}  # execution id -> (updated_at, step, transition) from the last lookup
+
+    @classmethod
+    def for_task(cls, client, task_id, handlers, **kw):
+        return cls(handlers, task_steps(client, task_id), client, **kw)
+
+    def _latest_transition(self, exe, span):
+        # -> (step, transition) of exe's newest transition, one lookup per snapshot
+        list_transitions = getattr(getattr(getattr(self.client, "executions", None), "transitions", None), "list", None)
+        if list_transitions is None:
+            return None, None
+        stamp = getattr(exe, "updated_at", None)
+        cached = self._transitions.get(exe.id)
+        if cached is not None and stamp is not None and cached[0] == stamp:
+            return cached[1], cached[2]
+        page = list_transitions(execution_id=exe.id, limit=1)  # newest first
+        _count(span, "api.executions.transitions.list")
+        items = list(getattr(page, "items", page) or [])
+        latest = items[0] if items else None
+        step = _step_pointer(latest) if latest is not None else None
+        self._transitions[exe.id] = (stamp, step, latest)
+        return step, latest
+
+    def _from_transitions(self, exe, span):
+        return self._latest_transition(exe, span)[0]
+
+    def arguments(self, exe, step, span=None):
+        # the tool call's arguments for `step`: from saved outputs if the expressions allow,
+        # else the output of the step's "wait" transition; None if neither has them
+        spec = self.arguments_spec[step] if step is not None and step < len(self.arguments_spec) else {}
+        out = getattr(exe, "output", None)
+        out = out if isinstance(out, dict) else {}
+        args = {}
+        for key, expr in spec.items():
+            m = _OUTPUT_REF.match(expr) if isinstance(expr, str) else None
+            ref = int(m.group(1)) if m else None
+            saved = self.save_as[ref] if ref is not None and ref < len(self.save_as) else None
+            if saved is None or saved not in out:
+                break
+            args[key] = out[saved]
+        else:
+            if spec:
+                return args
+        found, transition = self._latest_transition(exe, span)
+        if transition is None or found != step or _field(transition, "type") != "wait":
+            return None
+        output = _field(transition, "output")
+        return output if isinstance(output, dict) else None
+
+    def pending_step(self, exe, span=None):
+        step = _step_pointer(exe)
+        if step is not None:
+            return step
+        out = getattr(exe, "output", None)
+        out = out if isinstance(out, dict) else {}
+        step = next((i for i, key in enumerate(self.save_as) if key and key not in out), None)
+        if step in self.table and (exe.id, step) not in self._sent:
+            return step
+        # the outputs don't explain this pause (missing, stale, or a prompt still running)
+        found = self._from_transitions(exe, span)
+        return step if found is None else found
+
+    def dispatch(self, client, exe, span=None):
+        # answers exe's pending tool step -> tool name, or None if there is nothing to answer
+        step = self.pending_step(exe, span)
+        tool = self.table.get(step)
+        key = (exe.id, step)
+        if tool is None or key in self._sent:
+            self._check_stall(exe, step)
+            return None
+        self._stalled.pop(exe.id, None)
+        with self._lock:
+            payload = self._payloads.get(key)
+        if payload is None:
+            fetched = []
+
+            def arguments():
+                if not fetched:
+                    fetched.append(self.arguments(exe, step, span))
+                return fetched[0]
+            with self.tracer.span(f"tool.{tool}") as tool_span:
+                payload = self.handlers[tool](exe, arguments)
+                if self.tracer.enabled:
+                    tool_span.set(output_bytes=payload_bytes(payload))
+            with self._lock:
+                self._payloads[key] = payload
+        for attempt in range(self.retries + 1):
+            try:
+                with self.tracer.span("resume", tool=tool, attempt=attempt):
+                    client.executions.change_status(execution_id=exe.id, status="running", input=payload)
+                _count(span, "api.executions.change_status")
+                break
+            except Exception:
+                _count(span, "api.executions.change_status")
+                if attempt == self.retries:
+                    raise
+        with self._lock:
+            self._payloads.pop(key, None)
+            self._sent.add(key)
+        return tool
+
+    def _check_stall(self, exe, step):
+        first = self._stalled.setdefault(exe.id, self.clock())
+        if self.clock() - first > self.stall_timeout:
+            raise RuntimeError(
+                f"Execution {exe.id} has been awaiting_input for over {self.stall_timeout:g}s "
+                f"with no tool step pending (step {step})."
+            )
+
+    def forget(self, execution_id):
+        with self._lock:
+            self._sent = {k for k in self._sent if k[0] != execution_id}
+            self._payloads = {k: v for k, v in self._payloads.items() if k[0] != execution_id}
+            self._stalled.pop(execution_id, None)
+            self._transitions.pop(execution_id, None)
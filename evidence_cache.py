@@ -0,0 +1,157 @@
+# evidence_cache.py — persistent, content-addressed cache of extracted evidence
+#
+# Key = sha256(extractor prompt version + normalized resume text), so the same resume
+# seen under another requisition (or re-run) skips Task A. Changing the extraction
+# prompt/schema changes prompt_version, which turns every old entry into a miss;
+# purge_stale() reclaims their space. Eviction is least-recently-used by total bytes.
+import hashlib, json, re, sqlite3, threading, time
+
+_WS = re.compile(r"\s+")
+
+def normalize_resume_text(text):
+    return _WS.sub(" ", (text or "")).strip().lower()
+
+def resume_id(resume):
+    # stable id for a resume that has none: hash of its normalized text (the cache key
+    # without the prompt version), so the same resume gets the same id in every run
+    digest = hashlib.sha256(normalize_resume_text(resume.get("text")).encode("utf-8")).hexdigest()
+    return "h" + digest[:16]
+
+def prompt_version(task_definition):
+    # hash of everything that shapes extraction output: prompts, unwrap, schema
+    blob = json.dumps(
+        {k: task_definition.get(k) for k in ("main", "input_schema")},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+class EvidenceCache:
+    def __init__(self, path, prompt_version, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.prompt_version = prompt_version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS evidence ("
+            " key TEXT PRIMARY KEY, version TEXT NOT NULL, evidence TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS evidence_lru ON evidence(last_used)")
+        self._db.commit()
+
+    def key(self, resume):
+        text = normalize_resume_text(resume.get("text"))
+        return hashlib.sha256(f"{self.prompt_version}\n{text}".encode("utf-8")).hexdigest()
+
+    def split(self, resumes):
+        # -> (cached evidence items, resumes that still need the LLM)
+        keys = [self.key(r) for r in resumes]
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, evidence FROM evidence WHERE version = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [self.prompt_version, *chunk],
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._db.executemany("UPDATE evidence SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+                self._db.commit()
+        cached, misses = [], []
+        for r, k in zip(resumes, keys):
+            if k in found:
+                item = json.loads(found[k])
+                if r.get("name"):
+                    item["name"] = r["name"]  # same text filed under another name
+                item.pop("id", None)
+                if r.get("id"):
+                    item["id"] = r["id"]  # as Task A would have echoed it
+                cached.append(item)
+            else:
+                misses.append(r)
+        with self._lock:
+            self.hits += len(cached)
+            self.misses += len(misses)
+        return cached, misses
+
+    def store(self, resumes, items):
+        # match LLM evidence back to its resume by the echoed id, else by name (only when
+        # the name is unique in the batch); unmatched items are not cached
+        by_id, by_name, names = {}, {}, {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            if item.get("id") is not None:
+                by_id.setdefault(str(item["id"]), item)
+            if isinstance(item.get("name"), str):
+                by_name.setdefault(item["name"].strip().lower(), item)
+        for r in resumes:
+            key = (r.get("name") or "").strip().lower()
+            names[key] = names.get(key, 0) + 1
+        rows = []
+        now = time.time()
+        for r in resumes:
+            item = by_id.get(str(r["id"])) if r.get("id") else None
+            if item is None:
+                key = (r.get("name") or "").strip().lower()
+                item = by_name.get(key) if names[key] == 1 else None
+            if item is not None:
+                blob = json.dumps(item, ensure_ascii=False)
+                rows.append((self.key(r), self.prompt_version, blob, len(blob), now))
+        if not rows:
+            return 0
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO evidence VALUES (?, ?, ?, ?, ?)", rows)
+            self._evict()
+            self._db.commit()
+        return len(rows)
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM evidence").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM evidence ORDER BY last_used"):
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        self._db.executemany("DELETE FROM evidence WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def purge_stale(self):
+        # drop entries written under any other prompt version
+        with self._lock:
+            cur = self._db.execute("DELETE FROM evidence WHERE version != ?", (self.prompt_version,))
+            self._db.commit()
+        return cur.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM evidence")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM evidence WHERE version = ?", (self.prompt_version,)
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        self._db.close()
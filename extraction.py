@@ -0,0 +1,57 @@
+# extraction.py — split Task A into token-budgeted resume batches and merge the results
+import json
+
+from local_tools import HAVE_NUMPY, compute_scores_locally, top_n_heap, top_payload
+
+# ~4 characters per token for English prose / JSON; good enough for budgeting
+CHARS_PER_TOKEN = 4
+# resumes are embedded as a Python repr inside the prompt, plus per-item punctuation
+PER_RESUME_OVERHEAD = 8
+
+def estimate_tokens(resume):
+    text = json.dumps(resume, ensure_ascii=False)
+    return len(text) // CHARS_PER_TOKEN + PER_RESUME_OVERHEAD
+
+def batch_resumes(resumes, token_budget=6000, max_batch=50):
+    # Greedy packing in input order; a resume larger than the budget gets a batch of its
+    # own. Accepts any iterable, so resumes can be streamed in without materialising them.
+    batch, used = [], 0
+    for r in resumes:
+        cost = estimate_tokens(r)
+        if batch and (used + cost > token_budget or len(batch) >= max_batch):
+            yield batch
+            batch, used = [], 0
+        batch.append(r)
+        used += cost
+    if batch:
+        yield batch
+
+class StreamingScorer:
+    # Scores each batch's evidence the moment it arrives. Candidate scores don't depend
+    # on each other, so concatenating batches in input order and stable-sorting again
+    # gives exactly what compute_scores_locally returns for the merged evidence.
+    def __init__(self, criteria, n):
+        self.criteria = criteria
+        self.n = n
+        self.parts = {}
+
+    def add(self, batch_index, items):
+        scored = compute_scores_locally(self.criteria, {"evidence": items}, self.n, batch=HAVE_NUMPY)
+        self.parts[batch_index] = scored
+        return scored
+
+    def evidence(self):
+        return [item for b in sorted(self.parts) for item in self.parts[b]["evidence"]]
+
+    def result(self):
+        ranked = [r for b in sorted(self.parts) for r in self.parts[b]["ranked"]]
+        ranked.sort(key=lambda r: r["score"], reverse=True)
+        top_n_names = [r["name"] for r in ranked[:max(1, int(self.n))]]
+        return {"ranked": ranked, "top_n_names": top_n_names, "evidence": self.evidence()}
+
+    def top(self, store=None):
+        # top-N payload (see local_tools.top_payload); batch-ranked lists concatenated in
+        # batch order break ties exactly as the full stable sort does
+        entries = [r for b in sorted(self.parts) for r in self.parts[b]["ranked"]]
+        top = top_n_heap(entries, max(1, int(self.n)))
+        return top_payload(top, len(entries), store, entries)
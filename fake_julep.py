@@ -0,0 +1,311 @@
+# fake_julep.py — in-process stand-in for the Julep client (no network, no LLM)
+#
+# Interprets the same task definitions main_code.py sends to Julep:
+#   * "prompt" steps are answered by a responder looked up by the step's save_as
+#   * "tool" steps pause the execution in awaiting_input until change_status(input=...)
+#   * "return" steps resolve "$ steps[i].output" / "$ steps[0].input.x" expressions
+# Each executions.get() advances a running execution by at most one step, and only once
+# the step's simulated latency has elapsed (step_latency: seconds, {save_as: seconds} with
+# an optional "default", or a callable(step) -> seconds). `pauses` ({save_as: k}) makes
+# an execution report awaiting_input for k polls before that prompt step's output
+# appears, as the real backend sometimes does; `api_latency` delays every call and
+# `failure_rate` fails prompt steps at random. Transitions are recorded as the backend
+# does (executions.transitions.list, newest first; a tool step's "wait" transition carries
+# its resolved arguments as output); saved_outputs=False hides the saved step outputs from
+# snapshots of unfinished executions.
+import json, random, re, threading, time, uuid
+from collections import Counter
+from types import SimpleNamespace
+
+_EXPR = re.compile(r"^\$\s*steps\[(\d+)\]\.(input|output)((?:\.\w+)*)\s*$")
+_YEARS = re.compile(r"(\d+(?:\.\d+)?)\s*(?:\+\s*)?(?:y|yrs?|years?)\b", re.I)
+
+def fake_extract(ctx):
+    # crude comma-split extractor: "5y backend" chunks are experience, the rest skills
+    evidence = []
+    for r in ctx["input"].get("resumes", []):
+        skills, experience = [], []
+        for chunk in r.get("text", "").split(","):
+            chunk = chunk.strip(" .")
+            m = _YEARS.search(chunk)
+            if m:
+                role = (chunk[:m.start()] + chunk[m.end():]).strip() or "unspecified"
+                experience.append({"role": role, "years": float(m.group(1))})
+            elif chunk:
+                skills.append(chunk)
+        evidence.append({
+            **({"id": r["id"]} if r.get("id") else {}),
+            "name": r.get("name", "Unknown"),
+            "skills": skills,
+            "experience": experience,
+            "education": [],
+            "projects": [],
+        })
+    return json.dumps({"evidence": evidence})
+
+def fake_questions(ctx):
+    scored = ctx["saved"].get("scored") or {}
+    items = [
+        {"name": name, "questions": [f"Walk me through your most recent project, {name}."] * 2}
+        for name in scored.get("top_n_names", [])
+    ]
+    return json.dumps({"top_n_questions": items})
+
+DEFAULT_RESPONDERS = {
+    "evidence_json": fake_extract,
+    "questions_json": fake_questions,
+}
+
+def _dig(value, path):
+    for part in [p for p in path.split(".") if p]:
+        value = value.get(part) if isinstance(value, dict) else getattr(value, part, None)
+    return value
+
+class _Execution:
+    def __init__(self, task, task_input):
+        self.id = str(uuid.uuid4())
+        self.task = task
+        self.input = task_input
+        self.step = 0
+        self.outputs = []
+        self.saved = {}
+        self.status = "running"
+        self.output = {}
+        self.error = None
+        self.updated_at = time.time()
+        self.ready_at = 0.0
+        self.pauses = {}
+        self.transitions = []
+
+    def transition(self, type, current, next=None, output=None):
+        self.transitions.append(SimpleNamespace(
+            id=str(uuid.uuid4()), execution_id=self.id, type=type, created_at=time.time(),
+            current=SimpleNamespace(workflow="main", step=current),
+            next=None if next is None else SimpleNamespace(workflow="main", step=next),
+            output=output,
+        ))
+
+    def resolve(self, expr):
+        if not isinstance(expr, str):
+            return expr
+        m = _EXPR.match(expr)
+        if not m:
+            return expr
+        idx, kind, path = int(m.group(1)), m.group(2), m.group(3)
+        base = self.input if kind == "input" else (self.outputs[idx] if idx < len(self.outputs) else None)
+        return _dig(base, path)
+
+    def snapshot(self, status=None, saved_outputs=True):
+        if self.status in ("succeeded", "failed"):
+            output = self.output
+        else:
+            output = dict(self.saved) if saved_outputs else {}
+        return SimpleNamespace(
+            id=self.id, task_id=self.task.id, status=status or self.status,
+            output=output,
+            error=self.error, updated_at=self.updated_at,
+        )
+
+def _page(items, limit, offset):
+    return SimpleNamespace(items=items[offset:offset + limit])
+
+class _Agents:
+    def __init__(self, owner):
+        self.owner = owner
+        self.items = {}
+
+    def create(self, **kw):
+        obj = SimpleNamespace(id=str(uuid.uuid4()), **dict({"metadata": {}}, **kw))
+        with self.owner.lock:
+            self.owner.calls["agents.create"] += 1
+            self.items[obj.id] = obj
+        return obj
+
+    def update(self, agent_id, **kw):
+        with self.owner.lock:
+            self.owner.calls["agents.update"] += 1
+            obj = self.items[agent_id]
+            for k, v in kw.items():
+                setattr(obj, k, v)
+        return obj
+
+    def get(self, agent_id):
+        with self.owner.lock:
+            self.owner.calls["agents.get"] += 1
+            return self.items[agent_id]
+
+    def list(self, limit=100, offset=0):
+        with self.owner.lock:
+            self.owner.calls["agents.list"] += 1
+            return _page(list(self.items.values()), limit, offset)
+
+class _Tasks:
+    def __init__(self, owner):
+        self.owner = owner
+        self.items = {}
+
+    def create(self, agent_id=None, metadata=None, **task):
+        obj = SimpleNamespace(
+            id=str(uuid.uuid4()), agent_id=agent_id, name=task.get("name"),
+            metadata=metadata or {}, definition=task,
+        )
+        with self.owner.lock:
+            self.owner.calls["tasks.create"] += 1
+            self.items[obj.id] = obj
+        return obj
+
+    def create_or_update(self, task_id, agent_id=None, metadata=None, **task):
+        # same ID, new definition; executions started from then on run the new steps
+        with self.owner.lock:
+            self.owner.calls["tasks.create_or_update"] += 1
+            obj = self.items.get(task_id)
+            if obj is None:
+                obj = self.items[task_id] = SimpleNamespace(id=task_id)
+            obj.agent_id, obj.name = agent_id, task.get("name")
+            obj.metadata, obj.definition = metadata or {}, task
+        return obj
+
+    def get(self, task_id):
+        with self.owner.lock:
+            self.owner.calls["tasks.get"] += 1
+            return self.items[task_id]
+
+    def list(self, agent_id=None, limit=100, offset=0):
+        with self.owner.lock:
+            self.owner.calls["tasks.list"] += 1
+            items = [t for t in self.items.values() if agent_id is None or t.agent_id == agent_id]
+            return _page(items, limit, offset)
+
+class _Transitions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def list(self, execution_id, limit=100, offset=0):
+        # newest first, like the backend's default ordering
+        with self.owner.lock:
+            self.owner.calls["executions.transitions.list"] += 1
+            items = list(reversed(self.owner.executions.items[execution_id].transitions))
+            return _page(items, limit, offset)
+
+class _Executions:
+    def __init__(self, owner):
+        self.owner = owner
+        self.items = {}
+        self.transitions = _Transitions(owner)
+
+    def create(self, task_id, input):
+        self.owner._api_delay()
+        task = self.owner.tasks.items[task_id]
+        exe = _Execution(task, input)
+        with self.owner.lock:
+            self.owner.calls["executions.create"] += 1
+            exe.pauses = dict(self.owner.pauses)
+            exe.transition("init", 0, 0)
+            self.owner._schedule(exe)
+            self.items[exe.id] = exe
+        return self.owner._snapshot(exe)
+
+    def get(self, execution_id):
+        self.owner._api_delay()
+        with self.owner.lock:
+            self.owner.calls["executions.get"] += 1
+            exe = self.items[execution_id]
+            if exe.status == "running" and time.time() >= exe.ready_at:
+                main = exe.task.definition["main"]
+                step = main[exe.step] if exe.step < len(main) else {}
+                key = step.get("save_as") if "prompt" in step else None
+                if exe.pauses.get(key):
+                    exe.pauses[key] -= 1
+                    return self.owner._snapshot(exe, "awaiting_input")
+                self.owner._advance(exe)
+                self.owner._schedule(exe)
+                exe.updated_at = time.time()
+            return self.owner._snapshot(exe)
+
+    def change_status(self, execution_id, status, input=None):
+        self.owner._api_delay()
+        with self.owner.lock:
+            self.owner.calls["executions.change_status"] += 1
+            exe = self.items[execution_id]
+            if exe.status != "awaiting_input":
+                raise RuntimeError(f"execution {execution_id} is {exe.status}, not awaiting_input")
+            step = exe.task.definition["main"][exe.step]
+            exe.outputs.append(input)
+            if step.get("save_as"):
+                exe.saved[step["save_as"]] = input
+            exe.transition("resume", exe.step, exe.step + 1)
+            exe.step += 1
+            exe.status = status
+            self.owner._schedule(exe)
+            exe.updated_at = time.time()
+        return self.owner._snapshot(exe)
+
+class FakeJulep:
+    def __init__(self, responders=None, step_latency=0.0, api_latency=0.0, pauses=None,
+                 failure_rate=0.0, seed=None, saved_outputs=True):
+        self.lock = threading.RLock()
+        self.calls = Counter()
+        self.responders = dict(DEFAULT_RESPONDERS, **(responders or {}))
+        self.step_latency = step_latency
+        self.api_latency = api_latency
+        self.pauses = dict(pauses or {})
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.saved_outputs = saved_outputs
+        self.agents = _Agents(self)
+        self.tasks = _Tasks(self)
+        self.executions = _Executions(self)
+
+    def _snapshot(self, exe, status=None):
+        return exe.snapshot(status, self.saved_outputs)
+
+    def _api_delay(self):
+        if self.api_latency:
+            time.sleep(self.api_latency)
+
+    def _latency(self, step):
+        lat = self.step_latency
+        if callable(lat):
+            return lat(step)
+        if isinstance(lat, dict):
+            return lat.get(step.get("save_as"), lat.get("default", 0.0))
+        return lat
+
+    def _schedule(self, exe):
+        # the step the execution is now on completes no earlier than ready_at
+        main = exe.task.definition["main"]
+        if exe.status == "running" and exe.step < len(main):
+            exe.ready_at = time.time() + self._latency(main[exe.step])
+
+    def _advance(self, exe):
+        main = exe.task.definition["main"]
+        if exe.step >= len(main):
+            exe.status, exe.output = "succeeded", exe.outputs[-1] if exe.outputs else None
+            exe.transition("finish", exe.step - 1)
+            return
+        step = main[exe.step]
+        if "tool" in step:
+            # the wait transition carries the tool call's arguments, as the backend's does
+            exe.status = "awaiting_input"
+            args = {k: exe.resolve(v) for k, v in (step.get("arguments") or {}).items()}
+            exe.transition("wait", exe.step, output=args)
+        elif "return" in step:
+            exe.output = {k: exe.resolve(v) for k, v in step["return"].items()}
+            exe.status = "succeeded"
+            exe.transition("finish", exe.step)
+        else:
+            responder = self.responders.get(step.get("save_as"))
+            ctx = {"input": exe.input, "steps": exe.outputs, "saved": exe.saved, "step": step}
+            try:
+                if self.failure_rate and self.rng.random() < self.failure_rate:
+                    raise RuntimeError("simulated step failure")
+                out = responder(ctx) if responder else "{}"
+            except Exception as e:
+                exe.status, exe.error = "failed", repr(e)
+                exe.transition("error", exe.step)
+                return
+            exe.outputs.append(out)
+            if step.get("save_as"):
+                exe.saved[step["save_as"]] = out
+            exe.transition("step", exe.step, exe.step + 1)
+            exe.step += 1
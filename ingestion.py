@@ -0,0 +1,220 @@
+# ingestion.py — stream resumes from files and drop folders into Task A batching
+#
+# Walks files/directories and yields {"id", "name", "text"} records one at a time: text
+# is extracted by a pool of worker processes (PDF via the optional `pypdf`, DOCX with the
+# stdlib zip/XML reader, plain text as-is), whitespace is normalized and files whose
+# bytes were already seen are dropped. "id" is the file's path relative to the working
+# directory ("#k" appended for a dump's k-th document), unique per record; "name" is for
+# display only, taken from the resume's first line when that reads like a name. At most `max_in_flight` files are in the pool at
+# once, so memory stays bounded however big the folder is; records come out in walk
+# order and can go straight into extraction.batch_resumes / run_requisitions.
+# Plain-text files above `mmap_threshold` are treated as dumps: memory-mapped and split
+# on form feeds (what pdftotext emits between documents) without reading them whole.
+import hashlib, io, mmap, multiprocessing, os, re, zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+TEXT_EXTENSIONS = (".txt", ".md", ".text")
+SUPPORTED_EXTENSIONS = TEXT_EXTENSIONS + (".pdf", ".docx")
+
+_HSPACE = re.compile(r"[^\S\n]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_CONTROL = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_NAME_LINE = re.compile(r"[^\W\d_][\w'.\-]*(?: [^\W\d_][\w'.\-]*){1,4}")
+_GENERIC_STEMS = {"resume", "cv", "curriculum vitae", "document", "untitled"}
+
+def normalize_whitespace(text):
+    # tabs/NBSP/runs of spaces -> one space, blank-line runs -> one newline, no control chars
+    text = _CONTROL.sub(" ", text.replace("\r\n", "\n").replace("\r", "\n"))
+    text = _HSPACE.sub(" ", text)
+    return _BLANK_LINES.sub("\n", text).replace(" \n", "\n").replace("\n ", "\n").strip()
+
+def name_from_path(path):
+    # "alice_smith-cv.pdf" -> "Alice Smith Cv"; "alice/resume.pdf" -> "Alice"
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem.strip().lower() in _GENERIC_STEMS and os.path.basename(os.path.dirname(path)):
+        stem = os.path.basename(os.path.dirname(path))
+    return " ".join(w.capitalize() for w in re.split(r"[\s_\-.]+", stem) if w) or stem
+
+def name_from_text(text, default):
+    # the first line when it looks like a person's name (2-5 words, no digits), else default
+    first = text.split("\n", 1)[0].strip()
+    if len(first) <= 60 and _NAME_LINE.fullmatch(first) and first.lower() not in _GENERIC_STEMS:
+        return first
+    return default
+
+def record_id(path):
+    # relative to the working directory, "/"-separated; absolute when that's not possible
+    try:
+        rel = os.path.relpath(path)
+    except ValueError:  # another drive on Windows
+        rel = os.path.abspath(path)
+    return rel.replace(os.sep, "/")
+
+def _docx_text(data):
+    with zipfile.ZipFile(data) as z:
+        root = ElementTree.fromstring(z.read("word/document.xml"))
+    paragraphs = ("".join(t.text or "" for t in p.iter(f"{_W}t")) for p in root.iter(f"{_W}p"))
+    return "\n".join(paragraphs)
+
+def _pdf_text(data):
+    if PdfReader is None:
+        raise RuntimeError("PDF support needs `pip install pypdf`")
+    return "\n".join(page.extract_text() or "" for page in PdfReader(data).pages)
+
+def extract_text(path):
+    # -> (sha256 of the file bytes, raw extracted text)
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        return digest, _pdf_text(io.BytesIO(raw))
+    if ext == ".docx":
+        return digest, _docx_text(io.BytesIO(raw))
+    return digest, raw.decode("utf-8", errors="replace")
+
+def _load(path):
+    # worker entry point: never raises, so one bad file can't take the pool down
+    try:
+        digest, text = extract_text(path)
+        return path, digest, normalize_whitespace(text), None
+    except Exception as e:
+        return path, None, "", f"{type(e).__name__}: {e}"
+
+def iter_paths(paths, extensions=SUPPORTED_EXTENSIONS):
+    # files in the order given; directories walked recursively, sorted, hidden entries skipped
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as it:
+                entries = sorted((e for e in it if not e.name.startswith(".")), key=lambda e: e.name)
+            yield from iter_paths([e.path for e in entries], extensions)
+        elif path.lower().endswith(extensions):
+            yield path
+
+def iter_dump(path, separator=b"\f"):
+    # -> raw text of each separator-delimited document in a large text file, via mmap
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < len(mm):
+                end = mm.find(separator, start)
+                if end < 0:
+                    end = len(mm)
+                yield mm[start:end].decode("utf-8", errors="replace")
+                start = end + len(separator)
+
+def _pool_context():
+    # fork where available: spawn/forkserver would re-run a script's top level
+    # (main_code.py has no __main__ guard) in every worker
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+class ResumeIngestor:
+    def __init__(self, workers=None, max_in_flight=None, mmap_threshold=16 * 1024 * 1024,
+                 dump_separator="\f", min_chars=20, log=print):
+        # workers=0 extracts in-process (no pool); max_in_flight defaults to 4 per worker
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_in_flight = max_in_flight or 4 * max(1, self.workers)
+        self.mmap_threshold = mmap_threshold
+        self.dump_separator = dump_separator.encode("utf-8")
+        self.min_chars = min_chars
+        self.log = log
+        self.files = 0
+        self.records = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.errors = []
+        self._seen = set()  # 16-byte digests of files/records already yielded
+
+    def _is_dump(self, path):
+        return path.lower().endswith(TEXT_EXTENSIONS) and os.path.getsize(path) > self.mmap_threshold
+
+    def _first_seen(self, digest):
+        key = bytes.fromhex(digest)[:16]
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(key)
+        return True
+
+    def _record(self, rid, name, text):
+        if len(text) < self.min_chars:
+            self.skipped += 1
+            return None
+        self.records += 1
+        return {"id": rid, "name": name, "text": text}
+
+    def _from_dump(self, path):
+        base, rid = name_from_path(path), record_id(path)
+        for k, raw in enumerate(iter_dump(path, self.dump_separator), 1):
+            text = normalize_whitespace(raw)
+            if not self._first_seen(hashlib.sha256(text.encode("utf-8")).hexdigest()):
+                continue
+            # a dump's documents usually open with the candidate's name
+            record = self._record(f"{rid}#{k}", name_from_text(text, f"{base} #{k}"), text)
+            if record is not None:
+                yield record
+
+    def _from_result(self, result):
+        path, digest, text, error = result
+        self.files += 1
+        if error is not None:
+            self.errors.append((path, error))
+            self.log(f"Ingest: skipped {path}: {error}")
+            return None
+        if not self._first_seen(digest):
+            return None
+        return self._record(record_id(path), name_from_text(text, name_from_path(path)), text)
+
+    def ingest(self, paths):
+        # generator of {"id", "name", "text"}; `paths` may mix files and directories
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        paths = iter_paths([os.fspath(p) for p in paths])
+        if self.workers == 0:
+            for path in paths:
+                if self._is_dump(path):
+                    self.files += 1
+                    yield from self._from_dump(path)
+                    continue
+                record = self._from_result(_load(path))
+                if record is not None:
+                    yield record
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context()) as pool:
+            window = deque()  # futures (or dump paths) in walk order
+
+            def drain(limit):
+                while len(window) > limit:
+                    item = window.popleft()
+                    if isinstance(item, str):
+                        self.files += 1
+                        yield from self._from_dump(item)
+                        continue
+                    record = self._from_result(item.result())
+                    if record is not None:
+                        yield record
+
+            for path in paths:
+                # dumps are read here via mmap rather than pickled back from a worker
+                window.append(path if self._is_dump(path) else pool.submit(_load, path))
+                yield from drain(self.max_in_flight)
+            yield from drain(0)
+
+    def stats(self):
+        return {
+            "files": self.files, "records": self.records, "duplicates": self.duplicates,
+            "skipped": self.skipped, "errors": len(self.errors),
+        }
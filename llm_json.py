@@ -0,0 +1,246 @@
+# llm_json.py — one parsing stage for JSON that comes back from the LLM
+#
+# Clean JSON takes the fast path (orjson when installed, else json) and nothing else runs.
+# Only when that fails do we strip wrappers (markdown fences, prose around the payload,
+# a JSON document double-encoded as a string) and, failing that, repair truncation by
+# cutting back to the last complete element and closing the open brackets. Parsed
+# payloads are then checked with validators precompiled from schemas.py; bad fields are
+# reported per path and dropped, so one malformed candidate no longer empties the list.
+import json, re
+
+from schemas import EVIDENCE_ITEM_SCHEMA, QUESTION_ITEM_SCHEMA, compile_validator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_FENCE = re.compile(r"```[ \t]*(?:json|JSON)?[ \t]*\n?(.*?)(?:```|$)", re.S)
+
+def loads(text):
+    # both raise a ValueError subclass on bad input
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+def dumps(obj):
+    # compact UTF-8 JSON text (orjson when installed)
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def strip_wrappers(text):
+    # -> text from the first { or [ on, out of a markdown fence if there is one; prose
+    # after the value is left for close_json() to cut off
+    text = text.strip().lstrip("\ufeff")
+    m = _FENCE.search(text)
+    if m:
+        text = m.group(1).strip()
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    return text[min(starts):] if starts else text
+
+def close_json(text):
+    # -> (text, complete). If the first value closes, that value and complete=True (anything
+    # after it is dropped). If it is truncated, cut back to the last point where every open
+    # container could be closed (after a bracket or a complete string value, before a
+    # comma) and append the missing closers. (None, False) if nothing can be kept.
+    stack, in_string, escaped = [], False, False
+    expect_key = []  # per open container: an object expecting a key next
+    safe, safe_stack = None, None
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+                if not expect_key[-1]:
+                    safe, safe_stack = i + 1, list(stack)
+            continue
+        if ch == '"':
+            if not stack:
+                break
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            expect_key.append(ch == "{")
+            safe, safe_stack = i + 1, list(stack)
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                break  # mismatched: keep what was consistent so far
+            stack.pop()
+            expect_key.pop()
+            if not stack:
+                return text[:i + 1], True
+            safe, safe_stack = i + 1, list(stack)
+        elif ch == ",":
+            if not stack:
+                break
+            expect_key[-1] = stack[-1] == "}"
+            safe, safe_stack = i, list(stack)
+        elif ch == ":" and stack:
+            expect_key[-1] = False
+    if safe is None:
+        return None, False
+    return text[:safe].rstrip().rstrip(",") + "".join(reversed(safe_stack)), False
+
+def parse_llm_json(raw):
+    # -> (parsed object or None, notes); notes say what had to be fixed, or why it failed
+    if not isinstance(raw, (str, bytes)):
+        return raw, []
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="replace")
+    if not raw.strip():
+        return None, ["empty output"]
+    try:
+        obj = loads(raw)
+    except ValueError:
+        obj = raw
+    else:
+        if not isinstance(obj, str):
+            return obj, []
+    notes = []
+    if obj is not raw:
+        notes.append("unwrapped JSON encoded as a string")
+        raw = obj
+    text = strip_wrappers(raw)
+    stripped = text != raw.strip()
+    try:
+        obj = loads(text)
+    except ValueError as e:
+        error = e
+    else:
+        return obj, notes + ["stripped text around the JSON"] * stripped
+    fixed, complete = close_json(text)
+    if fixed is not None:
+        try:
+            obj = loads(fixed)
+        except ValueError:
+            pass
+        else:
+            if complete:
+                notes.append("stripped text around the JSON")
+            else:
+                notes += ["stripped text around the JSON"] * stripped + ["repaired truncated JSON"]
+            return obj, notes
+    notes.append(f"unparseable JSON: {error}")
+    return None, notes
+
+def _field_checks(schema):
+    # field -> (check for the whole value, check for one element of an array value,
+    # {property: (check, numeric)} when the elements are objects)
+    fields = {}
+    for key, sub in schema["properties"].items():
+        element = sub.get("items")
+        props = None
+        if element is not None and "properties" in element:
+            props = {
+                name: (compile_validator(p), p.get("type") in ("number", "integer"))
+                for name, p in element["properties"].items()
+            }
+        fields[key] = (
+            compile_validator(sub),
+            compile_validator(element) if element is not None else None,
+            props,
+        )
+    return fields
+
+_EVIDENCE_FIELDS = _field_checks(EVIDENCE_ITEM_SCHEMA)
+_QUESTION_FIELDS = _field_checks(QUESTION_ITEM_SCHEMA)
+_ARRAY_FIELDS = ("skills", "experience", "education", "projects")
+
+def _items(obj, key):
+    # the list under `key`, also accepting a bare list or a single item
+    if isinstance(obj, dict):
+        items = obj.get(key, obj if "name" in obj else None)
+    else:
+        items = obj
+    if isinstance(items, dict):
+        items = [items]
+    return items if isinstance(items, list) else None
+
+def _number(value):
+    # "5" / " 2.5 " -> float, as the old float(e.get("years")) read them; None otherwise
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number == number and abs(number) != float("inf") else None
+
+def _repair(element, props, path, errors):
+    # an array element that failed its schema: numeric strings become numbers and other bad
+    # properties are dropped, so {"role": "x", "years": "5"} still counts its 5 years
+    fixed = dict(element)
+    for name, (check, numeric) in props.items():
+        if name not in fixed or check.ok(fixed[name]):
+            continue
+        value = fixed[name]
+        if numeric and isinstance(value, str) and _number(value) is not None:
+            fixed[name] = _number(value)
+            continue
+        errors.extend(check(value, f"{path}.{name}"))
+        del fixed[name]
+    return fixed
+
+def _clean(items, key, fields):
+    # An item without a string name is skipped; otherwise each bad field is dropped, and
+    # in an array field only the bad elements (or their bad properties) are. Every problem
+    # is reported by path.
+    kept, errors = [], []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(f"$.{key}[{i}]: expected object, got {type(item).__name__}")
+            continue
+        if not isinstance(item.get("name"), str):
+            errors.append(f"$.{key}[{i}]: missing required field 'name'")
+            continue
+        clean = None
+        for field, value in item.items():
+            checks = fields.get(field)
+            if checks is None or checks[0].ok(value):
+                continue
+            if clean is None:
+                clean = dict(item)
+            path = f"$.{key}[{i}].{field}"
+            if isinstance(value, list) and checks[1] is not None:
+                good = []
+                for j, x in enumerate(value):
+                    if not checks[1].ok(x) and checks[2] is not None and isinstance(x, dict):
+                        x = _repair(x, checks[2], f"{path}[{j}]", errors)
+                    if checks[1].ok(x):
+                        good.append(x)
+                    else:
+                        errors.extend(checks[1](x, f"{path}[{j}]"))
+                clean[field] = good
+            else:
+                errors.extend(checks[0](value, path))
+                del clean[field]
+        kept.append(item if clean is None else clean)
+    return kept, errors
+
+def parse_evidence(raw):
+    # Task A output -> (evidence items, problems); problems list the fixes applied and
+    # every dropped item or field, e.g. "$.evidence[3].experience[0]: missing required field 'role'"
+    obj, notes = parse_llm_json(raw)
+    if obj is None and not notes:
+        return [], []
+    items = _items(obj, "evidence")
+    if items is None:
+        return [], notes + ["$.evidence: missing or not an array"]
+    kept, errors = _clean(items, "evidence", _EVIDENCE_FIELDS)
+    for i, item in enumerate(kept):
+        missing = [field for field in _ARRAY_FIELDS if field not in item]
+        if missing:
+            # a copy, so dicts passed in by the caller are left as they were
+            kept[i] = dict(item, **{field: [] for field in missing})
+    return kept, notes + errors
+
+def parse_questions(raw):
+    # InterviewerAgent output -> ({"top_n_questions": [...]}, problems)
+    obj, notes = parse_llm_json(raw)
+    if obj is None and not notes:
+        return {"top_n_questions": []}, []
+    items = _items(obj, "top_n_questions")
+    if items is None:
+        return {"top_n_questions": []}, notes + ["$.top_n_questions: missing or not an array"]
+    kept, errors = _clean(items, "top_n_questions", _QUESTION_FIELDS)
+    return {"top_n_questions": kept}, notes + errors
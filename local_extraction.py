@@ -0,0 +1,281 @@
+# local_extraction.py — cheap provisional evidence before (or instead of) the ExtractorAgent
+#
+# Skills are found with an Aho–Corasick automaton over every alias in the skill index
+# (one pass over the lowercased text, whatever the vocabulary size; `pyahocorasick` is
+# used when installed), then resolved to canonical names; aliases that are also English
+# words ("Go", "C", "Spark", "Express", "Shell") count only as capitalised list entries.
+# "5y backend" / "3+ years of Python" style phrases give experience entries, pre-filled
+# only when there is exactly one (the LLM's experience stays authoritative). The result
+# is used to
+#   * drop candidates with zero must-have coverage before any LLM call (prefilter=True),
+#   * tell Task A which fields were found, so it confirms them (listing the skills it
+#     rejects) and returns only the rest, and
+#   * fill the confirmed fields back in when Task A's evidence arrives (merge()).
+import re, time
+
+from evidence_cache import resume_id
+from local_tools import normalize_term
+from skill_index import default_index
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# short aliases ("go", "c", "ml") and aliases that are ordinary words count only when
+# written with a capital letter somewhere ("Go", "Spark") and standing alone as a list entry
+_AMBIGUOUS_LEN = 2
+_WORD_ALIASES = {
+    "agile", "airflow", "celery", "dynamo", "elastic", "express", "flask", "flutter", "helm",
+    "hibernate", "java", "kube", "lambda", "nest", "next", "node", "oracle", "pandas",
+    "rabbit", "rails", "react", "rest", "restful", "ruby", "rust", "shell", "snowflake",
+    "spark", "spring", "swift", "torch",
+}
+_WORD_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789+#")
+_WS = re.compile(r"\s+")
+_EXPERIENCE = re.compile(r"(?<![\w.])(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:y|yrs?|years?)\b\.?", re.I)
+_ROLE_WORDS = re.compile(r"[A-Za-z][\w+#/-]*|\S")
+_ROLE_FILLER = {"of", "experience", "exp", "in", "as", "a", "an", "the", "professional"}
+# a role ends at punctuation, a number, or any of these
+_ROLE_STOP = {
+    "and", "or", "at", "for", "with", "including", "where", "while", "on", "to", "from",
+    "by", "since", "across", "building", "working", "using",
+}
+# what an ambiguous short alias must sit between to count ("Go, Rust", "Java and C." but
+# not "Go-to person" or "C level exec")
+_LIST_EDGE = set(",;/|()[]:")
+_LIST_WORDS = {"and", "or", "&"}
+
+class _Automaton:
+    # plain dict-based Aho–Corasick: goto transitions, failure links, and for each state
+    # every key that ends there (`out`, inherited along the failure link)
+    def __init__(self, keys):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for key in keys:
+            state = 0
+            for ch in key:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] = (key,)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter(self, text):
+        # -> (end index inclusive, key) for every occurrence
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for key in out[state]:
+                yield i, key
+
+class SkillMatcher:
+    def __init__(self, skill_index=None):
+        self.skills = skill_index or default_index()
+        keys = [k for k in self.skills.exact if k]
+        if ahocorasick is not None:
+            self._auto = ahocorasick.Automaton()
+            for k in keys:
+                self._auto.add_word(k, k)
+            self._auto.make_automaton()
+        else:
+            self._auto = _Automaton(keys)
+
+    def find(self, text):
+        # -> canonical skills in order of first mention
+        original = _WS.sub(" ", text or "")
+        low = original.lower()
+        hits = []
+        for end, key in self._auto.iter(low):
+            start = end - len(key) + 1
+            if start > 0 and low[start - 1] in _WORD_CHARS and key[0] in _WORD_CHARS:
+                continue
+            if end + 1 < len(low) and low[end + 1] in _WORD_CHARS and key[-1] in _WORD_CHARS:
+                continue
+            ambiguous = (len(key) <= _AMBIGUOUS_LEN and key.isalpha()) or key in _WORD_ALIASES
+            if ambiguous and not _listed(original, start, end):
+                continue
+            hits.append((start, -len(key), key))
+        # longest match wins where matches overlap ("node.js" over "node")
+        hits.sort()
+        found, seen, covered = [], set(), -1
+        for start, neg_len, key in hits:
+            if start <= covered:
+                continue
+            covered = start - neg_len - 1
+            canon = self.skills.exact[key]
+            if canon not in seen:
+                seen.add(canon)
+                found.append(canon)
+        return found
+
+def _listed(text, start, end):
+    # written with a capital and standing alone as a list entry
+    if text[start:end + 1].islower():
+        return False
+    before = text[:start].rstrip()
+    after = text[end + 1:].lstrip()
+    left = not before or before[-1] in _LIST_EDGE or before.split()[-1].lower() in _LIST_WORDS
+    right = not after or after[0] in _LIST_EDGE or after[0] == "." or after.split()[0].lower() in _LIST_WORDS
+    return left and right
+
+def _role(text):
+    # up to 3 words right after a years phrase: "of Python experience" -> "Python"
+    words = []
+    for w in _ROLE_WORDS.findall(text[:60]):
+        low = w.lower()
+        if not w[0].isalpha() or low in _ROLE_STOP:
+            break
+        if low in _ROLE_FILLER and not words:
+            continue
+        words.append(w)
+        if len(words) == 3:
+            break
+    while words and words[-1].lower() in _ROLE_FILLER:
+        words.pop()
+    return " ".join(words)
+
+def extract_experience(text):
+    # "5y backend", "3+ years of Python experience" -> [{"role", "years"}], one per years
+    # phrase; overlapping spans ("6 years, including 4 of Python") are all listed as written
+    text = text or ""
+    return [
+        {"role": _role(text[m.end():]), "years": float(m.group(1))}
+        for m in _EXPERIENCE.finditer(text)
+    ]
+
+def unambiguous_experience(entries):
+    # what may be pre-filled for Task A: a single years phrase with a role. Several phrases
+    # may overlap or nest, which only the LLM can sort out.
+    return entries if len(entries) == 1 and entries[0]["role"] else []
+
+def _name_key(name):
+    return " ".join(str(name or "").split()).casefold()
+
+def _apply(local, item):
+    # local skills count unless Task A rejected them ("rejected_skills"), then its own are added
+    item = dict(item)
+    rejected = item.pop("rejected_skills", None)
+    rejected = set(normalize_term(s) for s in rejected if isinstance(s, str)) if isinstance(rejected, list) else set()
+    if "skills" in local:
+        skills = [s for s in local["skills"] if normalize_term(s) not in rejected]
+        have = set(skills)
+        for s in item.get("skills") or []:
+            if normalize_term(s) not in have:
+                skills.append(s)
+                have.add(normalize_term(s))
+        item["skills"] = skills
+    if "experience" in local and not item.get("experience"):
+        item["experience"] = local["experience"]  # the LLM's experience wins when it gave any
+    return item
+
+class LocalExtractor:
+    def __init__(self, skill_index=None, prefilter=False):
+        self.matcher = SkillMatcher(skill_index)
+        self.prefilter = prefilter
+        self.resumes = 0
+        self.skills_resolved = 0
+        self.experience_resolved = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    def extract(self, resume):
+        # -> provisional evidence item, same shape as Task A's
+        t0 = time.perf_counter()
+        text = resume.get("text") or ""
+        item = {
+            "name": resume.get("name", "Unknown"),
+            "skills": self.matcher.find(text),
+            "experience": extract_experience(text),
+            "education": [],
+            "projects": [],
+        }
+        self.seconds += time.perf_counter() - t0
+        self.resumes += 1
+        return item
+
+    def annotate(self, resumes, must_haves=(), rejected=None):
+        # Generator over resumes: each gets a "resolved" dict with the fields found locally
+        # (Task A checks them and returns only the rest) and, if it has none, an "id" Task A echoes back
+        # so merge() can find its evidence. With prefilter, candidates covering none of the
+        # must-haves are dropped here and their names appended to `rejected`.
+        must = set(normalize_term(x) for x in must_haves or [])
+        for r in resumes:
+            item = self.extract(r)
+            if self.prefilter and must and not must & set(item["skills"]):
+                self.rejected += 1
+                if rejected is not None:
+                    rejected.append(item["name"])
+                continue
+            resolved = {"skills": item["skills"], "experience": unambiguous_experience(item["experience"])}
+            resolved = {k: v for k, v in resolved.items() if v}
+            self.skills_resolved += "skills" in resolved
+            self.experience_resolved += "experience" in resolved
+            if not resolved:
+                yield r
+                continue
+            r = dict(r, resolved=resolved)
+            if not r.get("id"):
+                r["id"] = resume_id(r)
+            yield r
+
+    def merge(self, resumes, items):
+        # Put the locally resolved fields back into Task A's evidence -> (items, misses).
+        # Items are matched to resumes by the echoed "id", then by name (case and spacing
+        # ignored), then by position when the batch and the evidence are the same length.
+        # Skills are unioned, less any Task A rejected; resolved experience only fills an empty LLM answer. `misses`
+        # describes every resume whose resolved fields found no evidence item.
+        pending = {i: r for i, r in enumerate(resumes) if r.get("resolved")}
+        if not pending:
+            return items, []
+        by_id = {r["id"]: i for i, r in pending.items() if r.get("id")}
+        by_name = {}
+        for i, r in pending.items():
+            by_name.setdefault(_name_key(r.get("name")), []).append(i)
+        match = {}  # item index -> resume index
+        for j, item in enumerate(items):
+            i = by_id.get(item.get("id")) if item.get("id") is not None else None
+            if i is None:
+                same = [k for k in by_name.get(_name_key(item.get("name")), ()) if k in pending]
+                i = same[0] if len(same) == 1 else None
+            if i is not None and i in pending:
+                match[j] = i
+                del pending[i]
+        if len(items) == len(resumes):
+            for j in range(len(items)):
+                if j not in match and j in pending:
+                    match[j] = j
+                    del pending[j]
+        merged = list(items)
+        for j, i in match.items():
+            merged[j] = _apply(resumes[i]["resolved"], items[j])
+        misses = [
+            f"resolved fields of {resumes[i].get('name')!r} matched no evidence item" for i in sorted(pending)
+        ]
+        return merged, misses
+
+    def stats(self):
+        return {
+            "resumes": self.resumes,
+            "skills_resolved": self.skills_resolved,
+            "experience_resolved": self.experience_resolved,
+            "prefiltered": self.rejected,
+            "us_per_resume": self.seconds / self.resumes * 1e6 if self.resumes else 0.0,
+        }
@@ -0,0 +1,327 @@
+# local_tools.py — function tools executed on the client during awaiting_input pauses
+import heapq
+
+from llm_json import parse_evidence, parse_questions
+from question_dedupe import QuestionDeduper
+from skill_index import default_index
+
+try:
+    import numpy as np
+except ImportError:  # batch scoring is optional
+    np = None
+
+HAVE_NUMPY = np is not None
+
+DEFAULT_WEIGHTS = {"must_haves": 0.6, "nice_to_haves": 0.2, "experience": 0.2}
+
+# =========================
+# 1) FUNCTION TOOLS (LOCAL)
+# =========================
+
+def normalize_term(s):
+    # alias table lives in skill_aliases.json; unknown terms come back unchanged
+    return default_index().normalize(s)
+
+def load_evidence(evidence_json):
+    # evidence_json may be JSON string or dict; both go through llm_json (fences and
+    # truncation for strings, bad fields for both) -- use parse_evidence directly to see
+    # what was dropped
+    if not evidence_json:
+        return []
+    return parse_evidence(evidence_json)[0]
+
+def _experience_years(item):
+    # simple experience tally
+    exp_years = 0.0
+    for e in item.get("experience", []):
+        try:
+            exp_years += float(e.get("years", 0))
+        except Exception:
+            pass
+    return exp_years
+
+def format_rationale(must_cov, must_total, nice_cov, nice_total, exp_years):
+    rationale_bits = []
+    if must_total > 0:
+        rationale_bits.append(f"Must-haves: {must_cov}/{must_total}")
+    if nice_total > 0:
+        rationale_bits.append(f"Nice: {nice_cov}/{nice_total}")
+    rationale_bits.append(f"Exp: {exp_years:.0f}y")
+    return "; ".join(rationale_bits)
+
+def iter_scored(criteria, ev_list):
+    # one {"name", "score", "rationale"} per candidate, in input order, plus the item's
+    # "id" when it has one
+    must = set(normalize_term(x) for x in criteria.get("must_haves", []))
+    nice = set(normalize_term(x) for x in criteria.get("nice_to_haves", []))
+    weights = criteria.get("weights", DEFAULT_WEIGHTS)
+
+    for item in ev_list:
+        name = item.get("name") or "Unknown"
+        skills = set(normalize_term(s) for s in item.get("skills", []))
+        exp_years = _experience_years(item)
+
+        # coverage
+        must_cov = sum(1 for m in must if any(m.lower() == s.lower() for s in skills))
+        must_need = max(1, len(must))
+        must_score = must_cov / must_need
+
+        nice_cov = sum(1 for h in nice if any(h.lower() == s.lower() for s in skills))
+        nice_need = max(1, len(nice))
+        nice_score = nice_cov / nice_need
+
+        # cap at 8 years for normalization
+        exp_score = min(exp_years, 8.0) / 8.0
+
+        score = (
+            weights.get("must_haves", 0.6) * must_score +
+            weights.get("nice_to_haves", 0.2) * nice_score +
+            weights.get("experience", 0.2) * exp_score
+        )
+
+        rationale = format_rationale(must_cov, len(must), nice_cov, len(nice), exp_years)
+        entry = {"name": name, "score": round(score, 4), "rationale": rationale}
+        if item.get("id") is not None:
+            entry["id"] = item["id"]
+        yield entry
+
+def top_n_heap(entries, n):
+    # Bounded min-heap over a stream of scored entries: O(C log n) time, O(n) memory.
+    # Ties keep input order, so the result equals the first n of the full stable sort.
+    heap = []
+    for i, e in enumerate(entries):
+        key = (e["score"], -i)
+        if len(heap) < n:
+            heapq.heappush(heap, (key, e))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, e))
+    return [e for _, e in sorted(heap, key=lambda t: t[0], reverse=True)]
+
+def top_payload(top, total, store=None, entries=None):
+    # small tool payload: top-N only, plus a cursor into the locally kept full ranking
+    cursor = store.put(entries, offset=len(top)) if store is not None and total > len(top) else None
+    return {"ranked": top, "top_n_names": [r["name"] for r in top], "total": total, "next_cursor": cursor}
+
+def compute_scores_locally(criteria, evidence_json, n, batch=False, top_only=False, store=None):
+    # top_only=True returns just the n best (see top_payload) instead of the full ranking
+    # and evidence; pass a ranking.RankingStore to page through the rest afterwards.
+    if batch:
+        return compute_scores_batch(criteria, evidence_json, n, top_only, store)
+
+    ev_list = load_evidence(evidence_json)
+    n = max(1, int(n))
+    if top_only:
+        if store is None:
+            return top_payload(top_n_heap(iter_scored(criteria, ev_list), n), len(ev_list))
+        entries = list(iter_scored(criteria, ev_list))
+        return top_payload(top_n_heap(entries, n), len(entries), store, entries)
+
+    ranked = list(iter_scored(criteria, ev_list))
+    ranked.sort(key=lambda r: r["score"], reverse=True)
+    top_n_names = [r["name"] for r in ranked[:n]]
+    return {"ranked": ranked, "top_n_names": top_n_names, "evidence": ev_list}
+
+def dedupe_questions_locally(questions_json, threshold=0.7, across_candidates=False):
+    # Input is a JSON str or dict with key "top_n_questions": [{name, questions: [...]},{"..."}]
+    # Paraphrases count as duplicates at TF-IDF cosine >= threshold (question_dedupe.py);
+    # threshold=None keeps the old exact, case-insensitive matching only.
+    # across_candidates also drops questions already asked of an earlier candidate.
+    if isinstance(questions_json, str):
+        qobj = parse_questions(questions_json)[0]
+    else:
+        qobj = questions_json or {}
+
+    items = qobj.get("top_n_questions", [])
+    if threshold is not None:
+        return {"top_n_questions": _deduper(threshold).dedupe(items, across_candidates)}
+    cleaned = []
+    for item in items:
+        name = item.get("name", "Unknown")
+        qs = [q.strip() for q in item.get("questions", []) if isinstance(q, str)]
+        # simple de-dup while preserving order
+        seen = set()
+        uniq = []
+        for q in qs:
+            key = q.lower()
+            if key not in seen and q:
+                uniq.append(q)
+                seen.add(key)
+        cleaned.append({"name": name, "questions": uniq[:5]})
+    return {"top_n_questions": cleaned}
+
+_dedupers = {}
+
+def _deduper(threshold):
+    if threshold not in _dedupers:
+        _dedupers[threshold] = QuestionDeduper(threshold)
+    return _dedupers[threshold]
+
+def merge_results_locally(scored, questions_clean, evidence_json, store=None):
+    # Final RecruitmentResult assembled on the client from the two tool outputs; this used
+    # to be a second LLM round-trip that re-drafted the questions.
+    scored = scored or {}
+    ranked = list(scored.get("ranked", []))
+    cursor = scored.get("next_cursor")
+    # top_only payloads carry a cursor into the full ranking, which the merge consumes
+    if cursor and store is not None:
+        try:
+            while cursor:
+                page = store.page(cursor, limit=1000)
+                ranked.extend(page["ranked"])
+                cursor = page["next_cursor"]
+        finally:
+            store.drop(scored["next_cursor"])
+
+    # questions in ranking order; candidates left with no question are dropped (minItems 1)
+    order = {name: i for i, name in enumerate(scored.get("top_n_names", []))}
+    items = [q for q in (questions_clean or {}).get("top_n_questions", []) if q.get("questions")]
+    items.sort(key=lambda q: order.get(q.get("name"), len(order)))
+
+    evidence = scored["evidence"] if "evidence" in scored else load_evidence(evidence_json)
+    return {"ranked": ranked, "top_n_questions": items, "evidence": evidence}
+
+# ==========================================
+# 1b) BATCH SCORING (NumPy, whole pool)
+# ==========================================
+# Skills are encoded once into a canonical skill-ID vocabulary (key = lowercased
+# normalized term, matching the loop's case-insensitive comparison). Each candidate
+# becomes a row of a sparse 0/1 matrix stored CSR-style (indptr/indices); coverage
+# for a criteria list is then a single sparse matrix-vector product.
+
+class SkillMatrix:
+    def __init__(self, vocab, indptr, indices, exp_years, names, ids=None):
+        self.vocab = vocab          # lowered normalized term -> skill id
+        self.indptr = indptr        # row i owns indices[indptr[i]:indptr[i+1]]
+        self.indices = indices      # unique skill ids per row
+        self.exp_years = exp_years  # float64, one per candidate
+        self.names = names
+        self.ids = ids              # evidence "id" per candidate (None where absent), or None
+
+    def __len__(self):
+        return len(self.names)
+
+    def row_ids(self):
+        return np.repeat(np.arange(len(self.names)), np.diff(self.indptr))
+
+    def term_weights(self, terms):
+        # how many criteria terms hit each skill id; duplicates that survive the
+        # case-sensitive set() in the loop version are counted twice, as there
+        w = np.zeros(len(self.vocab) + 1, dtype=np.float64)
+        for t in terms:
+            w[self.vocab.get(t.lower(), len(self.vocab))] += 1.0
+        w[-1] = 0.0  # terms nobody has
+        return w[:-1]
+
+    def coverage(self, terms, row_ids=None):
+        if row_ids is None:
+            row_ids = self.row_ids()
+        w = self.term_weights(terms)
+        return np.bincount(row_ids, weights=w[self.indices], minlength=len(self.names))
+
+def encode_evidence(ev_list, vocab=None):
+    if np is None:
+        raise ImportError("numpy is required for batch scoring (pip install numpy)")
+    vocab = {} if vocab is None else vocab
+    indptr = [0]
+    indices = []
+    exp_years = []
+    names = []
+    ids = []
+    raw_ids = {}  # raw skill string -> id, so each distinct spelling is normalized once
+    for item in ev_list:
+        names.append(item.get("name") or "Unknown")
+        ids.append(item.get("id"))
+        row = set()
+        for s in item.get("skills", []):
+            sid = raw_ids.get(s)
+            if sid is None:
+                key = normalize_term(s).lower()
+                sid = vocab.get(key)
+                if sid is None:
+                    sid = vocab[key] = len(vocab)
+                raw_ids[s] = sid
+            row.add(sid)
+        indices.extend(row)
+        indptr.append(len(indices))
+        exp_years.append(_experience_years(item))
+    return SkillMatrix(
+        vocab,
+        np.asarray(indptr, dtype=np.int64),
+        np.asarray(indices, dtype=np.int64),
+        np.asarray(exp_years, dtype=np.float64),
+        names,
+        ids if any(i is not None for i in ids) else None,
+    )
+
+def score_matrix(matrix, criteria):
+    # returns (scores, must_cov, nice_cov, len(must), len(nice)) for every row at once
+    must = set(normalize_term(x) for x in criteria.get("must_haves", []))
+    nice = set(normalize_term(x) for x in criteria.get("nice_to_haves", []))
+    weights = criteria.get("weights", DEFAULT_WEIGHTS)
+
+    row_ids = matrix.row_ids()
+    must_cov = matrix.coverage(must, row_ids)
+    nice_cov = matrix.coverage(nice, row_ids)
+    exp_score = np.minimum(matrix.exp_years, 8.0) / 8.0
+
+    # same operation order as the loop so float results are bit-identical
+    scores = (
+        weights.get("must_haves", 0.6) * (must_cov / max(1, len(must))) +
+        weights.get("nice_to_haves", 0.2) * (nice_cov / max(1, len(nice))) +
+        weights.get("experience", 0.2) * exp_score
+    )
+    return scores, must_cov.astype(np.int64), nice_cov.astype(np.int64), len(must), len(nice)
+
+def select_top(scores, n):
+    # Indices of the n best candidates, ordered as the full ranking would order them:
+    # by the Python-rounded score, ties in input order. argpartition finds the n-th best
+    # raw score in O(C); everything that could round level with it is then sorted exactly.
+    count = len(scores)
+    if n < count:
+        kth = np.partition(scores, count - n)[count - n]
+        candidates = np.flatnonzero(scores >= kth - 1e-4)
+    else:
+        candidates = np.arange(count)
+    rounded = np.array([round(x, 4) for x in scores[candidates].tolist()], dtype=np.float64)
+    return candidates[np.lexsort((candidates, -rounded))[:n]]
+
+def _matrix_entry(matrix, criteria):
+    # -> (scores, entry(i, rounded score) -> {"name", "score", "rationale"[, "id"]})
+    scores, must_cov, nice_cov, must_total, nice_total = score_matrix(matrix, criteria)
+    must_l, nice_l, exp_l = must_cov.tolist(), nice_cov.tolist(), matrix.exp_years.tolist()
+
+    ids = matrix.ids
+
+    def entry(i, score):
+        out = {
+            "name": matrix.names[i],
+            "score": score,
+            "rationale": format_rationale(must_l[i], must_total, nice_l[i], nice_total, exp_l[i]),
+        }
+        if ids is not None and ids[i] is not None:
+            out["id"] = ids[i]
+        return out
+    return scores, entry
+
+def top_from_matrix(matrix, criteria, n, store=None):
+    # top_only payload straight from an encoded pool (e.g. candidate_store.CandidateStore)
+    scores, entry = _matrix_entry(matrix, criteria)
+    top = [entry(i, round(float(scores[i]), 4)) for i in select_top(scores, max(1, int(n))).tolist()]
+    # the rest of the ranking is only materialised if someone pages into it
+    rest = lambda: [entry(i, round(s, 4)) for i, s in enumerate(scores.tolist())]
+    return top_payload(top, len(matrix), store, rest)
+
+def compute_scores_batch(criteria, evidence_json, n, top_only=False, store=None):
+    ev_list = load_evidence(evidence_json)
+    matrix = encode_evidence(ev_list)
+    if top_only:
+        return top_from_matrix(matrix, criteria, n, store)
+
+    scores, entry = _matrix_entry(matrix, criteria)
+    n = max(1, int(n))
+    # Python round() (not np.round) to reproduce the loop's half-even-on-repr results
+    rounded = [round(s, 4) for s in scores.tolist()]
+    order = np.argsort(-np.asarray(rounded, dtype=np.float64), kind="stable")
+    ranked = [entry(i, rounded[i]) for i in order.tolist()]
+    top_n_names = [r["name"] for r in ranked[:n]]
+    return {"ranked": ranked, "top_n_names": top_n_names, "evidence": ev_list}
@@ -0,0 +1,160 @@
+# question_dedupe.py — offline near-duplicate detection for interview questions
+#
+# Questions become TF-IDF vectors over character n-grams of their normalized text
+# (skill aliases canonicalized first, so "Postgres" and "PostgreSQL" line up); two
+# questions are duplicates when their cosine similarity reaches `threshold`, unless
+# they are about different technologies ("...AWS Lambda..." vs "...AWS S3...").
+# IDF is taken over each candidate's own questions, so a candidate's result never
+# depends on who else is in the payload. Within one candidate all pairs are compared.
+# Across candidates, a MinHash/LSH index (32 bins in 16 bands of 2) narrows the
+# comparisons to likely matches first. Hashes are crc32, so signatures are stable
+# across processes.
+import math, re, zlib
+from collections import Counter
+
+from skill_index import default_index
+
+_WORDS = re.compile(r"[\w+#.]+")
+_EMPTY = 1 << 32
+_MAX_CACHED = 200_000  # n-gram -> MinHash bin entries kept between calls
+
+def _hash(gram):
+    return zlib.crc32(gram.encode("utf-8"))
+
+class QuestionDeduper:
+    def __init__(self, threshold=0.7, ngram=3, bands=16, rows=2, skill_index=None):
+        self.threshold = threshold
+        self.ngram = ngram
+        self.bands = bands
+        self.rows = rows
+        self.skills = skill_index or default_index()
+        self._bins = {}  # n-gram -> (bin, value) for _bands; the n-gram vocabulary is small
+
+    def _canonical(self, question):
+        # lowercased words with known skills replaced by their canonical name;
+        # returns (normalized text, set of skills mentioned)
+        words = [w.strip(".") for w in _WORDS.findall(question.lower())]
+        words = [w for w in words if w]
+        exact = self.skills.exact
+        out, mentioned, i = [], set(), 0
+        while i < len(words):
+            pair = f"{words[i]} {words[i + 1]}" if i + 1 < len(words) else None
+            if pair and pair in exact:
+                canon, i = exact[pair], i + 2
+            elif words[i] in exact:
+                canon, i = exact[words[i]], i + 1
+            else:
+                out.append(words[i])
+                i += 1
+                continue
+            mentioned.add(canon)
+            out.append(canon.lower())
+        return " ".join(out), mentioned
+
+    def _grams(self, text):
+        t = f" {text} "
+        n = self.ngram
+        return Counter([t[i:i + n] for i in range(max(1, len(t) - n + 1))])
+
+    def _prepare(self, question):
+        # -> (n-gram counts, skills mentioned)
+        text, skills = self._canonical(question)
+        return self._grams(text), skills
+
+    def vectorize(self, questions, prepared=None):
+        # -> [(unit TF-IDF dict, skills)] with IDF taken over `questions` themselves (one
+        # candidate's, in dedupe); `prepared` memoizes _prepare across calls
+        if prepared is None:
+            prepared = {}
+        grams = []
+        for q in questions:
+            if q not in prepared:
+                prepared[q] = self._prepare(q)
+            grams.append(prepared[q])
+        df = Counter()
+        for counts, _ in grams:
+            df.update(counts.keys())
+        total = len(grams)
+        # document frequency is at most `total`, so the IDF of every count is tabled once
+        idf = [math.log((1 + total) / (1 + d)) + 1.0 for d in range(total + 1)]
+        vectors = []
+        for counts, skills in grams:
+            vec = {g: c * idf[df[g]] for g, c in counts.items()}
+            norm = math.hypot(*vec.values()) or 1.0
+            vectors.append(({g: v / norm for g, v in vec.items()}, skills))
+        return vectors
+
+    def similar(self, x, y):
+        (va, sa), (vb, sb) = x, y
+        if sa and sb and sa != sb:
+            return False  # different technologies, however alike the wording
+        return sum([va[g] * vb[g] for g in va.keys() & vb.keys()]) >= self.threshold
+
+    def _bands(self, vec):
+        # one-permutation MinHash: each n-gram hash lands in one of bands*rows bins and
+        # every bin keeps its minimum, so a signature costs one pass over the n-grams
+        bins = self.bands * self.rows
+        cache = self._bins
+        if len(cache) > _MAX_CACHED:
+            cache.clear()
+        for g in [g for g in vec if g not in cache]:
+            h = _hash(g)
+            cache[g] = (h % bins, h // bins)
+        sig = [_EMPTY] * bins
+        for k, v in map(cache.__getitem__, vec):
+            if v < sig[k]:
+                sig[k] = v
+        r = self.rows
+        # short questions leave bins empty; an all-empty band would match everything
+        empty = (_EMPTY,) * r
+        return [(i, band) for i, band in enumerate(zip(*(sig[k::r] for k in range(r)))) if band != empty]
+
+    def dedupe(self, items, across_candidates=False, limit=5):
+        # items: [{"name", "questions": [...]}] -> same shape, near-duplicates removed
+        per_item = []
+        for item in items:
+            qs = [q.strip() for q in item.get("questions", []) if isinstance(q, str)]
+            # exact duplicates (case-insensitive) go first, as before
+            seen, uniq = set(), []
+            for q in qs:
+                key = q.lower()
+                if key not in seen and q:
+                    uniq.append(q)
+                    seen.add(key)
+            per_item.append(uniq)
+
+        # question text -> _prepare() / _bands(), shared by candidates asking the same thing
+        prepared, banded = {}, {}
+        # cross-candidate only: LSH band -> indices into `kept_vectors`, and the same per
+        # skill set, since similar() never matches questions about different skills
+        buckets, by_skills = {}, {}
+        no_skills = frozenset()
+        kept_vectors = []
+        cleaned = []
+        for item, qs in zip(items, per_item):
+            kept, local = [], []
+            for q, vec in zip(qs, self.vectorize(qs, prepared)):
+                if len(kept) >= limit:
+                    continue
+                if any(self.similar(vec, other) for other in local):
+                    continue
+                if across_candidates:
+                    bands = banded.get(q)
+                    if bands is None:
+                        bands = banded[q] = self._bands(vec[0])
+                    skills = frozenset(vec[1])
+                    if skills:
+                        near = {j for band in bands for j in by_skills.get((band, skills), ())}
+                        near.update(j for band in bands for j in by_skills.get((band, no_skills), ()))
+                    else:
+                        near = {j for band in bands for j in buckets.get(band, ())}
+                    if any(self.similar(vec, kept_vectors[j]) for j in near):
+                        continue
+                    for band in bands:
+                        buckets.setdefault(band, []).append(len(kept_vectors))
+                        by_skills.setdefault((band, skills), []).append(len(kept_vectors))
+                    kept_vectors.append(vec)
+                kept.append(q)
+                local.append(vec)
+            cleaned.append({"name": item.get("name", "Unknown"), "questions": kept})
+        return cleaned
@@ -0,0 +1,154 @@
+# ranking.py — re-rank one requisition's candidates as criteria/weights are tweaked
+#
+# Extraction is the expensive part; once a requisition's evidence is encoded we keep
+#   * the skill matrix (per-candidate coverage vectors) in both row and column form,
+#   * must/nice coverage counts per candidate and the capped experience score,
+# and patch only what an edit touches: adding/removing a must-have adds/subtracts one
+# skill column, a weight change just recombines three vectors. No LLM involved.
+import itertools, threading, time
+
+from local_tools import (
+    DEFAULT_WEIGHTS, encode_evidence, format_rationale, load_evidence, normalize_term, np, select_top,
+)
+
+class IncrementalRanker:
+    def __init__(self, criteria, evidence_json):
+        self.ev_list = load_evidence(evidence_json)
+        self.matrix = encode_evidence(self.ev_list)
+        m = self.matrix
+        row_ids = m.row_ids()
+        # column view: candidates that have skill id j are col_rows[col_ptr[j]:col_ptr[j+1]]
+        order = np.argsort(m.indices, kind="stable")
+        self.col_rows = row_ids[order]
+        self.col_ptr = np.searchsorted(m.indices[order], np.arange(len(m.vocab) + 1))
+        self.exp_score = np.minimum(m.exp_years, 8.0) / 8.0
+
+        self.must, self.nice = set(), set()
+        self.must_cov = np.zeros(len(m), dtype=np.int64)
+        self.nice_cov = np.zeros(len(m), dtype=np.int64)
+        self.weights = None  # forces the first update() to compute scores
+        self.update(
+            must_haves=criteria.get("must_haves", []),
+            nice_to_haves=criteria.get("nice_to_haves", []),
+            weights=criteria.get("weights", DEFAULT_WEIGHTS),
+        )
+
+    def _column(self, term):
+        sid = self.matrix.vocab.get(term.lower())
+        if sid is None:
+            return self.col_rows[:0]
+        return self.col_rows[self.col_ptr[sid]:self.col_ptr[sid + 1]]
+
+    def _patch(self, cov, old, new):
+        for t in old - new:
+            cov[self._column(t)] -= 1
+        for t in new - old:
+            cov[self._column(t)] += 1
+
+    def update(self, must_haves=None, nice_to_haves=None, weights=None):
+        # any argument left as None keeps its current value; returns what was recomputed
+        changed = []
+        if must_haves is not None:
+            must = set(normalize_term(x) for x in must_haves)
+            if must != self.must:
+                self._patch(self.must_cov, self.must, must)
+                self.must = must
+                changed.append("must_haves")
+        if nice_to_haves is not None:
+            nice = set(normalize_term(x) for x in nice_to_haves)
+            if nice != self.nice:
+                self._patch(self.nice_cov, self.nice, nice)
+                self.nice = nice
+                changed.append("nice_to_haves")
+        if weights is not None and weights != self.weights:
+            self.weights = dict(weights)
+            changed.append("weights")
+        if changed:
+            w = self.weights
+            # same operation order as compute_scores_locally, so scores match it exactly
+            self.scores = (
+                w.get("must_haves", 0.6) * (self.must_cov / max(1, len(self.must))) +
+                w.get("nice_to_haves", 0.2) * (self.nice_cov / max(1, len(self.nice))) +
+                w.get("experience", 0.2) * self.exp_score
+            )
+        return changed
+
+    def _entry(self, i):
+        out = {
+            "name": self.matrix.names[i],
+            "score": round(float(self.scores[i]), 4),
+            "rationale": format_rationale(
+                int(self.must_cov[i]), len(self.must), int(self.nice_cov[i]), len(self.nice),
+                float(self.matrix.exp_years[i]),
+            ),
+        }
+        if self.matrix.ids is not None and self.matrix.ids[i] is not None:
+            out["id"] = self.matrix.ids[i]
+        return out
+
+    def top(self, n):
+        # top-n in O(C) via argpartition, ordered exactly as compute_scores_locally would
+        ranked = [self._entry(i) for i in select_top(self.scores, max(1, int(n))).tolist()]
+        return {"ranked": ranked, "top_n_names": [r["name"] for r in ranked]}
+
+    def result(self, n):
+        # full compute_scores_locally-shaped payload
+        order = sorted(range(len(self.scores)), key=lambda i: -round(float(self.scores[i]), 4))
+        ranked = [self._entry(i) for i in order]
+        top_n_names = [r["name"] for r in ranked[:max(1, int(n))]]
+        return {"ranked": ranked, "top_n_names": top_n_names, "evidence": self.ev_list}
+
+class RankingStore:
+    # Full rankings stay on the client; tool payloads carry only top-N and a cursor
+    # ("<ranking id>:<offset>"). Entries are kept in input order and sorted (stable, by
+    # score) on the first page request; they may also be given as a zero-arg callable
+    # so a ranking nobody pages into is never materialised.
+    # A ranking lives until it is dropped, paged to its end, or left unused for `ttl`
+    # seconds (None: never), however many other rankings are put meanwhile; the scheduler
+    # drops each requisition's ranking once its result is merged.
+    def __init__(self, ttl=3600.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._rankings = {}
+
+    def put(self, entries, offset=0):
+        now = time.monotonic()
+        with self._lock:
+            if self.ttl is not None:
+                for rid in [r for r, v in self._rankings.items() if now - v["used"] > self.ttl]:
+                    del self._rankings[rid]
+            rid = str(next(self._ids))
+            self._rankings[rid] = {"entries": entries, "sorted": False, "used": now}
+        return f"{rid}:{offset}"
+
+    def page(self, cursor, limit=50):
+        rid, _, offset = cursor.partition(":")
+        with self._lock:
+            ranking = self._rankings.get(rid)
+            if ranking is None:
+                raise KeyError(f"unknown or expired ranking cursor {cursor!r}")
+            if not ranking["sorted"]:
+                entries = ranking["entries"]
+                entries = list(entries() if callable(entries) else entries)
+                entries.sort(key=lambda r: r["score"], reverse=True)
+                ranking["entries"], ranking["sorted"] = entries, True
+            ranked = ranking["entries"]
+            ranking["used"] = time.monotonic()
+            offset = int(offset or 0)
+            end = offset + max(1, int(limit))
+            if end >= len(ranked):
+                del self._rankings[rid]  # cursor used up
+        return {
+            "ranked": ranked[offset:end],
+            "total": len(ranked),
+            "next_cursor": f"{rid}:{end}" if end < len(ranked) else None,
+        }
+
+    def drop(self, cursor):
+        with self._lock:
+            self._rankings.pop(cursor.partition(":")[0], None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rankings)
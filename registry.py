@@ -0,0 +1,120 @@
+# registry.py — reuse agents and tasks across runs instead of creating them every start
+#
+# Each definition is hashed (sha256 of its canonical JSON). IDs and hashes are cached
+# on disk; when the cached hash still matches, the cached ID is used with no API call.
+# On a cache miss the backend is searched by name (the hash is kept in metadata), and
+# only a drifted or missing definition is updated or created. Tasks are looked up per
+# agent; a drifted task is updated in place (tasks.create_or_update on its ID), so the
+# old version isn't left behind as an orphan, and dispatch's cached steps for it are dropped.
+import hashlib, json, os, threading
+from types import SimpleNamespace
+
+from dispatch import forget_task_steps
+
+DEFAULT_CACHE_PATH = ".julep_registry.json"
+
+def definition_hash(definition):
+    blob = json.dumps(definition, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+def _items(page):
+    items = getattr(page, "items", page)
+    return list(items or [])
+
+def _metadata(obj):
+    meta = getattr(obj, "metadata", None)
+    return meta if isinstance(meta, dict) else {}
+
+class Registry:
+    def __init__(self, client, cache_path=DEFAULT_CACHE_PATH, page_size=100):
+        self.client = client
+        self.cache_path = cache_path
+        self.page_size = page_size
+        self.api_calls = 0
+        self._lock = threading.Lock()
+        self._cache = {"agents": {}, "tasks": {}}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, encoding="utf-8") as f:
+                    self._cache.update(json.load(f))
+            except (OSError, ValueError):
+                pass  # unreadable cache: fall back to the backend lookup
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.cache_path)
+
+    def _list(self, fn, **kw):
+        offset = 0
+        while True:
+            self.api_calls += 1
+            page = _items(fn(limit=self.page_size, offset=offset, **kw))
+            yield from page
+            if len(page) < self.page_size:
+                return
+            offset += len(page)
+
+    def agent(self, name, **definition):
+        # -> object with .id; create/update kwargs are the usual client.agents.create ones
+        definition = dict(definition, name=name)
+        h = definition_hash(definition)
+        with self._lock:
+            cached = self._cache["agents"].get(name)
+            if cached and cached["hash"] == h:
+                return SimpleNamespace(id=cached["id"], name=name, reused="cache")
+
+            existing = next((a for a in self._list(self.client.agents.list) if getattr(a, "name", None) == name), None)
+            metadata = dict(definition.pop("metadata", None) or {}, definition_hash=h)
+            if existing is not None and _metadata(existing).get("definition_hash") == h:
+                obj, how = existing, "backend"
+            elif existing is not None:
+                self.api_calls += 1
+                obj, how = self.client.agents.update(existing.id, metadata=metadata, **definition), "updated"
+            else:
+                self.api_calls += 1
+                obj, how = self.client.agents.create(metadata=metadata, **definition), "created"
+            self._cache["agents"][name] = {"id": obj.id, "hash": h}
+            self._save()
+        return SimpleNamespace(id=obj.id, name=name, reused=how)
+
+    def task(self, agent_id, definition):
+        # -> object with .id and .name for client.tasks.create(agent_id=..., **definition)
+        name = definition["name"]
+        h = definition_hash({"agent_id": agent_id, **definition})
+        key = f"{agent_id}/{name}"
+        with self._lock:
+            cached = self._cache["tasks"].get(key)
+            if cached and cached["hash"] == h:
+                return SimpleNamespace(id=cached["id"], name=name, reused="cache")
+
+            task_id = cached["id"] if cached else None
+            if task_id is None:
+                existing = [t for t in self._list(self.client.tasks.list, agent_id=agent_id)
+                            if getattr(t, "name", None) == name]
+                current = next((t for t in existing if _metadata(t).get("definition_hash") == h), None)
+                if current is not None:
+                    self._cache["tasks"][key] = {"id": current.id, "hash": h}
+                    self._save()
+                    return SimpleNamespace(id=current.id, name=name, reused="backend")
+                task_id = existing[0].id if existing else None
+            self.api_calls += 1
+            metadata = dict(definition.get("metadata") or {}, definition_hash=h)
+            if task_id is not None:
+                obj = self.client.tasks.create_or_update(task_id, agent_id=agent_id, **dict(definition, metadata=metadata))
+                how = "updated"
+                forget_task_steps(task_id)  # dispatchers built from now on read the new steps
+            else:
+                obj, how = self.client.tasks.create(agent_id=agent_id, **dict(definition, metadata=metadata)), "created"
+            self._cache["tasks"][key] = {"id": obj.id, "hash": h}
+            self._save()
+        return SimpleNamespace(id=obj.id, name=name, reused=how)
+
+    def forget(self):
+        # drop the local cache (e.g. after agents were deleted on the backend)
+        with self._lock:
+            self._cache = {"agents": {}, "tasks": {}}
+            self._save()
@@ -0,0 +1,351 @@
+# scheduler.py — run many Task A / Task B executions concurrently
+#
+# Julep's Python client is synchronous, so every in-flight execution gets a worker
+# thread that polls it and answers its awaiting_input pauses. The pool size is the
+# concurrency cap. Works unchanged against fake_julep.FakeJulep.
+import itertools, time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from compaction import compact_evidence
+from dispatch import ToolDispatcher
+from evidence_cache import resume_id
+from extraction import StreamingScorer, batch_resumes
+from llm_json import dumps, parse_evidence, parse_questions
+from local_tools import (
+    HAVE_NUMPY, compute_scores_locally, dedupe_questions_locally, load_evidence, merge_results_locally,
+)
+from schemas import validate_result
+from tracing import NULL_TRACER, payload_bytes
+from waiting import WaitStrategy
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+def rank_tool_handlers(criteria, evidence_json, n, scorer=None, store=None, sent=None,
+                       compact_format="lines", candidate_token_budget=200, tracer=None):
+    # per-requisition handlers, called with the paused execution and a zero-arg callable
+    # returning the tool call's arguments (see dispatch.py). A StreamingScorer
+    # that already scored the evidence while Task A batches arrived is reused as-is.
+    # With a ranking.RankingStore only the top-N (plus a cursor) goes back to Julep.
+    # The scoring payload also carries evidence_compact, the top-N-only evidence the
+    # question prompt embeds (see compaction.py).
+    # Payloads are also recorded in `sent` ({"scored", "questions_clean", "compaction"}),
+    # with anything the questions parser had to fix or drop under "question_errors".
+    sent = {} if sent is None else sent
+    tracer = tracer or NULL_TRACER
+
+    def compute_scores(exe, arguments=None):
+        if scorer is not None:
+            with tracer.span("scorer.top" if store is not None else "scorer.result") as span:
+                payload = scorer.top(store) if store is not None else scorer.result()
+                ev_list = scorer.evidence()
+        else:
+            with tracer.span("compute_scores_locally") as span:
+                payload = compute_scores_locally(
+                    criteria, evidence_json, n, batch=HAVE_NUMPY, top_only=store is not None, store=store,
+                )
+                ev_list = load_evidence(evidence_json)
+        span.set(candidates=len(ev_list))
+        with tracer.span("compact_evidence") as span:
+            payload["evidence_compact"], sent["compaction"] = compact_evidence(
+                ev_list, payload, compact_format, candidate_token_budget, evidence_json,
+            )
+            span.set(**sent["compaction"])
+        sent["scored"] = payload
+        return payload
+
+    def dedupe_questions(exe, arguments=None):
+        # the drafted questions are the tool call's "questions" argument (a dict or a
+        # stringified JSON); saved outputs are not always exposed, so they are only the
+        # fallback. The exe we were handed is already the latest snapshot.
+        args = arguments() if arguments is not None else None
+        questions = (args or {}).get("questions")
+        if questions is None:
+            questions = (getattr(exe, "output", {}) or {}).get("questions_json")
+        with tracer.span("dedupe_questions_locally") as span:
+            parsed, sent["question_errors"] = parse_questions(questions)
+            if questions is None:
+                sent["question_errors"] = ["no questions: neither tool-call arguments nor questions_json available"]
+            payload = dedupe_questions_locally(parsed)
+            if tracer.enabled:
+                span.set(input_bytes=payload_bytes(questions), output_bytes=payload_bytes(payload))
+        sent["questions_clean"] = payload
+        return payload
+
+    return {"compute_scores": compute_scores, "dedupe_questions": dedupe_questions}
+
+def build_result(res, store=None):
+    # Task B ends after dedupe_questions; the RecruitmentResult is merged here, from what
+    # the tool handlers sent (falling back to the execution's returned outputs)
+    out = getattr(res["rank"], "output", None)
+    out = out if isinstance(out, dict) else {}
+    scored = res["sent"].get("scored") or out.get("scored")
+    questions = res["sent"].get("questions_clean") or out.get("questions_clean")
+    result = merge_results_locally(scored, questions, res["evidence_json"], store)
+    return result, validate_result(result)
+
+def drive_execution(client, task_id, task_input, tool_handlers=None, wait_strategy=None,
+                    metrics=None, label="", log=print, tracer=None, trace_parent=None):
+    # tool_handlers: {tool name: handler(exe, arguments) -> payload} or a dispatch.ToolDispatcher;
+    # without any, a pause (e.g. on a prompt step) is waited out like any other unexplained one
+    tracer = tracer or NULL_TRACER
+    with tracer.span("execution", parent=trace_parent, task_id=task_id, label=label.strip(" []")) as span:
+        if tracer.enabled:
+            span.set(input_bytes=payload_bytes(task_input))
+        exe = client.executions.create(task_id=task_id, input=task_input)
+        span.add("api.executions.create")
+        span.set(execution_id=exe.id)
+        log(f"Execution{label}: {exe.id}")
+        waiter = (wait_strategy or WaitStrategy()).waiter(exe.id, metrics)
+        phase = None  # span of the status currently observed
+        dispatcher = None
+        while True:
+            t0 = time.perf_counter()
+            exe = client.executions.get(exe.id)
+            span.add("api.executions.get")
+            span.add("poll_s", time.perf_counter() - t0)
+            waiter.observed(exe)
+            log(f"Status{label}: {exe.status}")
+            if phase is None or phase.name != f"status.{exe.status}":
+                if phase is not None:
+                    phase.end()
+                phase = tracer.start(f"status.{exe.status}", parent=span)
+            if exe.status == "awaiting_input":
+                if dispatcher is None:
+                    dispatcher = tool_handlers if isinstance(tool_handlers, ToolDispatcher) else \
+                        ToolDispatcher.for_task(client, task_id, tool_handlers or {}, tracer=tracer)
+                tool = dispatcher.dispatch(client, exe, span)
+                if tool is None:
+                    log(f"Waiting: no tool step pending yet{label}...")
+                else:
+                    waiter.resumed()
+                    log(f"{tool} -> resumed{label}.")
+            elif exe.status in TERMINAL_STATUSES:
+                break
+            t0 = time.perf_counter()
+            waiter.wait()
+            span.add("wait_s", time.perf_counter() - t0)
+        waiter.done()
+        if dispatcher is not None:
+            dispatcher.forget(exe.id)
+        phase.end()
+        span.set(status=exe.status)
+        if tracer.enabled:
+            span.set(output_bytes=payload_bytes(getattr(exe, "output", None)))
+    log(f"Final status{label}: {exe.status}")
+    return exe
+
+class ExecutionScheduler:
+    def __init__(self, client, max_concurrency=8, wait_strategy=None, metrics=None,
+                 ranking_store=None, compact_format="lines", candidate_token_budget=200, log=print,
+                 tracer=None):
+        self.client = client
+        self.ranking_store = ranking_store
+        self.compact_format = compact_format
+        self.candidate_token_budget = candidate_token_budget
+        self.wait_strategy = wait_strategy or WaitStrategy()
+        self.metrics = metrics
+        self.log = log
+        self.tracer = tracer or NULL_TRACER
+        self.max_concurrency = max_concurrency
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="julep-exec")
+
+    def submit(self, task_id, task_input, tool_handlers=None, label="", trace_parent=None):
+        return self.pool.submit(
+            drive_execution, self.client, task_id, task_input,
+            tool_handlers, self.wait_strategy, self.metrics, label, self.log, self.tracer, trace_parent,
+        )
+
+    def shutdown(self, wait=True):
+        self.pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def _submit_rank(self, rank_task_id, i, req, res, merged, trace_parent=None):
+        evidence_json = res["evidence_json"]
+        if merged:
+            evidence_json = dumps({"evidence": res["scorer"].evidence()})
+            res["evidence_json"] = evidence_json
+        handlers = rank_tool_handlers(
+            req["criteria"], evidence_json, req["n"], res["scorer"], self.ranking_store, res["sent"],
+            self.compact_format, self.candidate_token_budget, self.tracer,
+        )
+        return self.submit(
+            rank_task_id,
+            {"criteria": req["criteria"], "evidence_json": evidence_json, "n": req["n"]},
+            handlers, label=f" [B{i}]", trace_parent=trace_parent,
+        )
+
+    def _feed(self, i, resumes, res, token_budget, evidence_cache, on_evidence):
+        # yields (part index, resume batch) for Task A, pulling `resumes` lazily; cached
+        # evidence is scored in place, 500 resumes at a time, as its own part
+        parts = itertools.count()
+        if evidence_cache is not None:
+            resumes = self._uncached(i, resumes, res, parts, evidence_cache, on_evidence)
+        if token_budget:
+            batches = batch_resumes(resumes, token_budget)
+        else:
+            batch = list(resumes)
+            batches = [batch] if batch or evidence_cache is None else []
+        for batch in batches:
+            yield next(parts), batch
+
+    def _uncached(self, i, resumes, res, parts, evidence_cache, on_evidence, chunk=500):
+        resumes = iter(resumes)
+        first = True
+        while True:
+            block = list(itertools.islice(resumes, chunk))
+            if not block and not first:
+                return
+            first = False
+            cached, misses = evidence_cache.split(block)
+            res["scorer"].add(next(parts), cached)
+            if cached and on_evidence is not None:
+                on_evidence(i, cached)
+            yield from misses
+            if len(block) < chunk:
+                return
+
+    def run_requisitions(self, extract_task_id, rank_task_id, requisitions, token_budget=None,
+                         on_evidence=None, evidence_cache=None, max_pending_batches=None,
+                         local_extractor=None):
+        # requisitions: [{"criteria", "resumes", "n"}, ...]; Task B of a requisition starts
+        # as soon as its Task A finishes. Yields (index, result) in completion order.
+        # With token_budget, Task A runs as parallel token-budgeted batches; each batch's
+        # evidence is scored on arrival (and passed to on_evidence(index, items)), then
+        # merged into one {"evidence": [...]} before Task B.
+        # With evidence_cache, only cache misses go to Task A; cached evidence is merged in
+        # ahead of the batches it was read with (as its own part, per 500 resumes), and fresh
+        # evidence is written back to the cache.
+        # "resumes" may be any iterable (e.g. ingestion.ResumeIngestor.ingest): batches are
+        # pulled only while fewer than max_pending_batches Task A executions are in flight
+        # (default 2 x max_concurrency, round-robin across requisitions), so memory stays
+        # bounded by the in-flight batches rather than the size of the drop folder.
+        # With local_extractor (local_extraction.LocalExtractor), resumes are annotated with
+        # the skills/experience found locally before batching (and, with its prefilter,
+        # candidates covering no must-have are dropped into res["prefiltered"]); those
+        # fields are merged back into Task A's evidence.
+        # LLM outputs are parsed by llm_json: what had to be repaired or was dropped lands in
+        # res["parse_errors"] (prefixed with the batch label) instead of silently vanishing.
+        # Each requisition is one trace: a "requisition" span parents its executions.
+        # res["started"] is the time.perf_counter() at which its first execution was submitted.
+        max_pending = max_pending_batches or 2 * self.max_concurrency
+        pending = {}
+        results = {}
+        feeds = {}
+        spans = {}
+        extracting = 0
+        # Task B's evidence_json is rebuilt from the scored items whenever they may differ
+        # from Task A's raw output (several batches, cached parts, locally resolved fields)
+        merged = bool(token_budget or evidence_cache or local_extractor is not None)
+
+        def finish(i):
+            res = results.pop(i)
+            cursor = (res["sent"].get("scored") or {}).get("next_cursor")
+            if cursor and self.ranking_store is not None:
+                self.ranking_store.drop(cursor)  # not merged (Task B failed): nobody will page it
+            span = spans.pop(i)
+            span.set(evidence=len(res["scorer"].evidence()), prefiltered=len(res["prefiltered"]))
+            span.end(error=res["error"])
+            return res
+
+        for i, req in enumerate(requisitions):
+            res = results[i] = {
+                "extract": None, "rank": None, "evidence_json": "", "error": None,
+                "batches": {}, "scorer": StreamingScorer(req["criteria"], req["n"]), "sent": {},
+                "result": None, "validation_errors": [], "parse_errors": [], "prefiltered": [],
+                "started": None,
+            }
+            spans[i] = self.tracer.start("requisition", parent=None, index=i, role=req["criteria"].get("role", ""))
+            # every resume carries an id Task A echoes back (candidate_store keys on it)
+            resumes = (r if r.get("id") else dict(r, id=resume_id(r)) for r in req["resumes"])
+            if local_extractor is not None:
+                resumes = local_extractor.annotate(resumes, req["criteria"].get("must_haves"), res["prefiltered"])
+            feeds[i] = self._feed(i, resumes, res, token_budget, evidence_cache, on_evidence)
+
+        while pending or feeds:
+            while feeds and extracting < max_pending:
+                for i in list(feeds):
+                    if extracting >= max_pending:
+                        break
+                    res = results[i]
+                    nxt = next(feeds[i], None)
+                    if nxt is None:
+                        del feeds[i]
+                        if not res["batches"]:
+                            # every batch already finished (or every resume was cached)
+                            if res["started"] is None:
+                                res["started"] = time.perf_counter()
+                            fut = self._submit_rank(rank_task_id, i, requisitions[i], res, merged, spans[i])
+                            pending[fut] = (i, "B", None)
+                        continue
+                    b, batch = nxt
+                    res["batches"][b] = batch
+                    label = f" [A{i}.{b}]" if token_budget else f" [A{i}]"
+                    if res["started"] is None:
+                        res["started"] = time.perf_counter()
+                    fut = self.submit(extract_task_id, {"resumes": batch}, label=label, trace_parent=spans[i])
+                    pending[fut] = (i, "A", b)
+                    extracting += 1
+            if not pending:
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                i, stage, b = pending.pop(fut)
+                if stage == "A":
+                    extracting -= 1
+                if i not in results:
+                    continue  # an earlier batch of this requisition already failed it
+                res = results[i]
+                try:
+                    exe = fut.result()
+                except Exception as e:
+                    res["error"] = f"Task {stage} raised {e!r}"
+                    feeds.pop(i, None)
+                    yield i, finish(i)
+                    continue
+
+                if stage == "B":
+                    res["rank"] = exe
+                    if exe.status != "succeeded":
+                        res["error"] = f"Task B {exe.status}"
+                    else:
+                        res["parse_errors"].extend(f"B{i} questions_json {p}" for p in res["sent"].get("question_errors", []))
+                        try:
+                            res["result"], res["validation_errors"] = build_result(res, self.ranking_store)
+                        except Exception as e:
+                            # only this requisition is lost; the others keep running
+                            res["error"] = f"merge raised {e!r}"
+                    yield i, finish(i)
+                    continue
+
+                res["extract"] = exe
+                if exe.status != "succeeded":
+                    res["error"] = f"Task A {exe.status}"
+                    feeds.pop(i, None)
+                    yield i, finish(i)
+                    continue
+                res["evidence_json"] = (getattr(exe, "output", {}) or {}).get("evidence_json") or ""
+                items, problems = parse_evidence(res["evidence_json"])
+                batch = res["batches"].pop(b)  # done with the resume text
+                with self.tracer.span("score_batch", parent=spans[i], batch=b, candidates=len(items)) as span:
+                    if local_extractor is not None:
+                        items, misses = local_extractor.merge(batch, items)
+                        problems += misses
+                    res["scorer"].add(b, items)
+                    if problems:
+                        span.set(parse_errors=len(problems))
+                        res["parse_errors"].extend(f"A{i}.{b} evidence_json {p}" for p in problems)
+                        if not merged:
+                            res["evidence_json"] = dumps({"evidence": items})  # Task B gets the repaired JSON
+                if evidence_cache is not None:
+                    evidence_cache.store(batch, items)
+                if on_evidence is not None:
+                    on_evidence(i, items)
+                if i not in feeds and not res["batches"]:
+                    fut = self._submit_rank(rank_task_id, i, requisitions[i], res, merged, spans[i])
+                    pending[fut] = (i, "B", None)
@@ -0,0 +1,169 @@
+# schemas.py — JSON schema of the final result, shared by the orchestrator and local merge
+
+RECRUITMENT_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "ranked": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "score": {"type": "number"},
+                    "rationale": {"type": "string", "maxLength": 240}
+                },
+                "required": ["name", "score", "rationale"]
+            }
+        },
+        "top_n_questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "questions": {
+                        "type": "array",
+                        "items": {"type": "string", "maxLength": 200},
+                        "maxItems": 5, "minItems": 1
+                    }
+                },
+                "required": ["name", "questions"]
+            }
+        },
+        "evidence": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "skills": {"type": "array", "items": {"type": "string"}},
+                    "experience": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "role": {"type": "string"},
+                                "years": {"type": "number"}
+                            },
+                            "required": ["role"]
+                        }
+                    },
+                    "education": {"type": "array", "items": {"type": "string"}},
+                    "projects": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["name"]
+            }
+        }
+    },
+    "required": ["ranked", "top_n_questions", "evidence"]
+}
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+}
+
+# the item shapes the LLM steps return, checked field by field as their outputs are parsed
+# (llm_json.py). Interviewer questions are not capped yet: dedupe trims them to 5.
+EVIDENCE_ITEM_SCHEMA = RECRUITMENT_RESULT_SCHEMA["properties"]["evidence"]["items"]
+QUESTION_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "questions": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["name"]
+}
+
+def compile_validator(schema):
+    # Turns a schema into a check(instance, path="$") closure once, so validating many
+    # results doesn't re-read the schema dicts. Handles the keywords our schemas use
+    # (type, properties, required, items, minItems/maxItems, maxLength) and returns a
+    # list of "path: problem" strings. check.ok(instance) is the same test as a bool;
+    # check() runs it first and only builds paths and messages for values that fail.
+    expected = schema.get("type")
+    py_type = _TYPES[expected] if expected else None
+    numeric = expected in ("number", "integer")
+    required = tuple(schema.get("required", ()))
+    properties = tuple((key, compile_validator(sub)) for key, sub in schema.get("properties", {}).items())
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    max_length = schema.get("maxLength")
+    check_item = compile_validator(schema["items"]) if "items" in schema else None
+    item_ok = check_item.ok if check_item is not None else None
+
+    def ok(instance):
+        if py_type is not None and (not isinstance(instance, py_type) or (numeric and isinstance(instance, bool))):
+            return False
+        if isinstance(instance, dict):
+            for key in required:
+                if key not in instance:
+                    return False
+            for key, check_value in properties:
+                if key in instance and not check_value.ok(instance[key]):
+                    return False
+        elif isinstance(instance, list):
+            if min_items is not None and len(instance) < min_items:
+                return False
+            if max_items is not None and len(instance) > max_items:
+                return False
+            if item_ok is not None:
+                for item in instance:
+                    if not item_ok(item):
+                        return False
+        elif isinstance(instance, str):
+            if max_length is not None and len(instance) > max_length:
+                return False
+        return True
+
+    if not (required or properties or check_item or max_length is not None
+            or min_items is not None or max_items is not None):
+        # a bare type test, by far the most common node
+        if numeric:
+            ok = lambda instance: isinstance(instance, py_type) and not isinstance(instance, bool)
+        elif py_type is not None:
+            ok = lambda instance: isinstance(instance, py_type)
+
+    def check(instance, path="$"):
+        if ok(instance):
+            return []
+        if py_type is not None and (not isinstance(instance, py_type) or (numeric and isinstance(instance, bool))):
+            return [f"{path}: expected {expected}, got {type(instance).__name__}"]
+        errors = []
+        if isinstance(instance, dict):
+            for key in required:
+                if key not in instance:
+                    errors.append(f"{path}: missing required field '{key}'")
+            for key, check_value in properties:
+                if key in instance:
+                    errors.extend(check_value(instance[key], f"{path}.{key}"))
+        elif isinstance(instance, list):
+            if min_items is not None and len(instance) < min_items:
+                errors.append(f"{path}: {len(instance)} items, need at least {min_items}")
+            if max_items is not None and len(instance) > max_items:
+                errors.append(f"{path}: {len(instance)} items, allowed at most {max_items}")
+            if check_item is not None:
+                for i, item in enumerate(instance):
+                    if not item_ok(item):
+                        errors.extend(check_item(item, f"{path}[{i}]"))
+        elif isinstance(instance, str):
+            if max_length is not None and len(instance) > max_length:
+                errors.append(f"{path}: {len(instance)} chars, allowed at most {max_length}")
+        return errors
+
+    check.ok = ok
+    return check
+
+validate_result = compile_validator(RECRUITMENT_RESULT_SCHEMA)
+_compiled = {id(RECRUITMENT_RESULT_SCHEMA): (RECRUITMENT_RESULT_SCHEMA, validate_result)}
+
+def validate(instance, schema, path="$"):
+    # compiles `schema` on first use; same errors as the compiled check
+    entry = _compiled.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        entry = _compiled[id(schema)] = (schema, compile_validator(schema))
+    return entry[1](instance, path)
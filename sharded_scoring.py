@@ -0,0 +1,196 @@
+# sharded_scoring.py — score very large pools across processes (or machines), merge top-N
+#
+# The pool is cut into contiguous shards. Each shard is scored on its own (NumPy batch
+# scoring when installed, else the loop) and returns only its partial top-N, keyed by
+# (rounded score, position in the whole pool). The parent only parses the JSON; each shard
+# validates its own slice (llm_json), so that work is spread too. Merging the partials by score, then
+# position, gives exactly what compute_scores_locally(top_only=True) gives in one process:
+# a candidate in the global top-N is always in its own shard's top-N.
+#
+# File contract, for spreading shards over several machines (any shared directory):
+#   write_shards(evidence, dir, shard_size)   dir/manifest.json + dir/shard-00000.jsonl, ...
+#   score_shard_file(dir, k, criteria, n)     on any node -> dir/shard-00000.top.json, written
+#                                             atomically; its presence marks shard k done
+#   merge_dir(dir, n)                         once every shard has its .top.json
+#   python sharded_scoring.py split EVIDENCE_JSON DIR [--shard-size 100000]
+#   python sharded_scoring.py score DIR SHARD CRITERIA_JSON N
+#   python sharded_scoring.py merge DIR N
+import argparse, heapq, json, os
+from concurrent.futures import ProcessPoolExecutor
+
+from ingestion import _pool_context
+from llm_json import _items, dumps, loads, parse_llm_json
+from local_tools import (
+    _matrix_entry, encode_evidence, iter_scored, load_evidence, np, select_top, top_payload,
+)
+
+# (criteria, raw evidence list) of the sharded call in progress; forked workers inherit it
+# instead of having their shard pickled over
+_shared = None
+
+def score_shard(criteria, items, offset, n):
+    # -> {"offset", "count", "top": [[score, pool position, entry], ...]} best first; `items`
+    # are validated here, and positions count only the items that pass, which keeps them in
+    # pool order across shards
+    n = max(1, int(n))
+    items = load_evidence(items)
+    if np is not None and items:
+        scores, entry = _matrix_entry(encode_evidence(items), criteria)
+        top = []
+        for i in select_top(scores, n).tolist():
+            score = round(float(scores[i]), 4)
+            top.append([score, offset + i, entry(i, score)])
+    else:
+        best = heapq.nsmallest(n, ((-e["score"], offset + i, e) for i, e in enumerate(iter_scored(criteria, items))))
+        top = [[-neg, pos, e] for neg, pos, e in best]
+    return {"offset": offset, "count": len(items), "top": top}
+
+def merge_partials(partials, n):
+    # -> (global top-n entries, pool size)
+    partials = list(partials)
+    best = heapq.nsmallest(max(1, int(n)), (
+        (-score, pos, entry) for p in partials for score, pos, entry in p["top"]
+    ))
+    return [entry for _, _, entry in best], sum(p["count"] for p in partials)
+
+def shard_bounds(count, shards):
+    # contiguous [start, stop) ranges, sizes differing by at most one
+    shards = max(1, min(int(shards), count or 1))
+    step, extra = divmod(count, shards)
+    bounds, start = [], 0
+    for k in range(shards):
+        stop = start + step + (k < extra)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+def _raw_evidence(evidence_json):
+    # the evidence list as parsed (fences and truncation repaired), not yet validated
+    obj, _ = parse_llm_json(evidence_json)
+    return _items(obj, "evidence") or []
+
+def _score_range(start, stop, n):
+    criteria, ev_list = _shared
+    return score_shard(criteria, ev_list[start:stop], start, n)
+
+def compute_scores_sharded(criteria, evidence_json, n, workers=None, shards=None, store=None,
+                           min_shard=20_000):
+    # top_only payload (see local_tools.top_payload) scored by `workers` processes; pools
+    # smaller than 2 x min_shard, or workers=1, are scored in-process. With a
+    # ranking.RankingStore the full ranking is only computed if someone pages into it.
+    global _shared
+    ev_list = _raw_evidence(evidence_json) if evidence_json else []
+    workers = (os.cpu_count() or 1) if workers is None else max(1, int(workers))
+    workers = min(workers, max(1, len(ev_list) // min_shard))
+    bounds = shard_bounds(len(ev_list), shards or workers)
+    if workers == 1:
+        partials = [score_shard(criteria, ev_list[a:b], a, n) for a, b in bounds]
+    else:
+        ctx = _pool_context()
+        forked = ctx.get_start_method() == "fork"
+        _shared = (criteria, ev_list)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                if forked:
+                    futures = [pool.submit(_score_range, a, b, n) for a, b in bounds]
+                else:
+                    futures = [pool.submit(score_shard, criteria, ev_list[a:b], a, n) for a, b in bounds]
+                partials = [f.result() for f in futures]
+        finally:
+            _shared = None
+    top, total = merge_partials(partials, n)
+    return top_payload(top, total, store, lambda: list(iter_scored(criteria, load_evidence(ev_list))))
+
+# =========================
+# FILE CONTRACT (multi-node)
+# =========================
+
+def _shard_path(directory, k):
+    return os.path.join(directory, f"shard-{k:05d}.jsonl")
+
+def _write_atomic(path, text):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def write_shards(evidence, directory, shard_size=100_000):
+    # evidence: any iterable of items (streamed, one shard file at a time) -> manifest
+    os.makedirs(directory, exist_ok=True)
+    shards, offset, f = [], 0, None
+    for item in evidence:
+        if f is None or shards[-1]["count"] == shard_size:
+            if f is not None:
+                f.close()
+            k = len(shards)
+            shards.append({"file": os.path.basename(_shard_path(directory, k)), "offset": offset, "count": 0})
+            f = open(_shard_path(directory, k), "w", encoding="utf-8")
+        f.write(dumps(item) + "\n")
+        shards[-1]["count"] += 1
+        offset += 1
+    if f is not None:
+        f.close()
+    manifest = {"total": offset, "shards": shards}
+    _write_atomic(os.path.join(directory, "manifest.json"), json.dumps(manifest, indent=2))
+    return manifest
+
+def _manifest(directory):
+    with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def score_shard_file(directory, k, criteria, n):
+    # scores shard k of `directory`; safe to re-run (the result file is simply replaced)
+    shard = _manifest(directory)["shards"][k]
+    with open(os.path.join(directory, shard["file"]), encoding="utf-8") as f:
+        items = [loads(line) for line in f if line.strip()]
+    partial = score_shard(criteria, items, shard["offset"], n)
+    _write_atomic(_shard_path(directory, k)[:-len(".jsonl")] + ".top.json", dumps(partial))
+    return partial
+
+def merge_dir(directory, n):
+    # top_only payload from every shard's .top.json; raises if any shard is not done yet
+    shards = _manifest(directory)["shards"]
+    partials, missing = [], []
+    for k in range(len(shards)):
+        path = _shard_path(directory, k)[:-len(".jsonl")] + ".top.json"
+        if not os.path.exists(path):
+            missing.append(k)
+            continue
+        with open(path, encoding="utf-8") as f:
+            partials.append(loads(f.read()))
+    if missing:
+        raise FileNotFoundError(f"shards not scored yet: {missing}")
+    top, total = merge_partials(partials, n)
+    return top_payload(top, total)
+
+def main():
+    ap = argparse.ArgumentParser(description="Sharded scoring over a shared directory.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    split = sub.add_parser("split", help="cut an {\"evidence\": [...]} file into shards")
+    split.add_argument("evidence_json")
+    split.add_argument("directory")
+    split.add_argument("--shard-size", type=int, default=100_000)
+    score = sub.add_parser("score", help="score one shard")
+    score.add_argument("directory")
+    score.add_argument("shard", type=int)
+    score.add_argument("criteria_json")
+    score.add_argument("n", type=int)
+    merge = sub.add_parser("merge", help="merge every shard's partial top-N")
+    merge.add_argument("directory")
+    merge.add_argument("n", type=int)
+    args = ap.parse_args()
+
+    if args.cmd == "split":
+        with open(args.evidence_json, encoding="utf-8") as f:
+            manifest = write_shards(load_evidence(f.read()), args.directory, args.shard_size)
+        print(f"{manifest['total']} candidates in {len(manifest['shards'])} shards")
+    elif args.cmd == "score":
+        with open(args.criteria_json, encoding="utf-8") as f:
+            criteria = json.load(f)
+        partial = score_shard_file(args.directory, args.shard, criteria, args.n)
+        print(f"shard {args.shard}: {partial['count']} candidates scored")
+    else:
+        print(json.dumps(merge_dir(args.directory, args.n), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
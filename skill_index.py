@@ -0,0 +1,135 @@
+# skill_index.py — compiled alias table behind normalize_term
+import csv, json, os, re
+from functools import lru_cache
+
+DEFAULT_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_aliases.json")
+
+_SPLIT = re.compile(r"[\s,;/()]+")
+_NON_KEY = re.compile(r"[^a-z0-9+#]")          # keep + and # so C++ / C# survive
+_VERSION_TOKEN = re.compile(r"^v?\d+(\.\d+)*(\.x|x|\+)?$")
+# name, separator and version of "python3.11", "node-18", "postgres14"
+_TRAILING_VERSION = re.compile(r"^(.*?)([\s._-]*)v?(\d+(?:\.\d+)*)(?:\.x|x|\+)?$")
+
+def _compact(key):
+    return _NON_KEY.sub("", key)
+
+class SkillIndex:
+    # Lookups go, cheapest first:
+    #   1. exact (stripped, lowercased)        "postgres"    -> PostgreSQL
+    #   2. punctuation/space-insensitive        "Node JS"     -> Node.js
+    #   3. token-level, version tokens dropped  "Postgres 14" -> PostgreSQL
+    #   4. trailing version glued on            "python3.11"  -> Python
+    #      only a real version: dotted, after a separator, or left of a 3+ char name, so
+    #      "ES2015" and "S3" are not read as "es" / "s" plus a version
+    # Every distinct raw string is resolved once and then served from an LRU cache.
+    def __init__(self, aliases=None, cache_size=65536):
+        self.exact = {}
+        self.compact = {}
+        self.calls = 0
+        self.unknown = 0
+        self._cached = lru_cache(maxsize=cache_size)(self._resolve)
+        if aliases:
+            self.add(aliases)
+
+    def add(self, aliases):
+        # {"Canonical": ["alias", ...]} or {"alias": "Canonical"}
+        for k, v in aliases.items():
+            if isinstance(v, str):
+                self._add_one(k, v)
+            else:
+                self._add_one(k, k)
+                for alias in v:
+                    self._add_one(alias, k)
+        self._cached.cache_clear()
+
+    def _add_one(self, alias, canonical):
+        key = alias.strip().lower()
+        self.exact[key] = canonical
+        # first writer wins so "ts" and "t.s." don't fight over the same compact key
+        self.compact.setdefault(_compact(key), canonical)
+
+    def _resolve(self, s):
+        key = s.strip().lower()
+        hit = self.exact.get(key)
+        if hit is not None:
+            return hit
+        compact = _compact(key)
+        hit = self.compact.get(compact)
+        if hit is not None:
+            return hit
+        tokens = [t for t in _SPLIT.split(key) if t and not _VERSION_TOKEN.match(t)]
+        if tokens:
+            joined = " ".join(tokens)
+            hit = self.exact.get(joined) or self.compact.get(_compact(joined))
+            if hit is not None:
+                return hit
+        m = _TRAILING_VERSION.match(key)
+        if m:
+            name, sep, version = m.groups()
+            stripped = _compact(name)
+            if stripped and ("." in version or sep or len(stripped) >= 3):
+                return self.compact.get(stripped)
+        return None
+
+    def lookup(self, s):
+        # canonical name or None; non-strings are never known
+        self.calls += 1
+        hit = self._cached(s) if isinstance(s, str) else None
+        if hit is None:
+            self.unknown += 1
+        return hit
+
+    def normalize(self, s):
+        hit = self.lookup(s)
+        return s if hit is None else hit
+
+    def stats(self):
+        info = self._cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "entries": len(self.exact),
+            "calls": self.calls,
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_hit_rate": info.hits / lookups if lookups else 0.0,
+            "unknown": self.unknown,
+            "unknown_rate": self.unknown / self.calls if self.calls else 0.0,
+        }
+
+    def reset_stats(self):
+        self.calls = 0
+        self.unknown = 0
+        self._cached.cache_clear()
+
+def load_aliases(path):
+    # JSON: {"Canonical": [aliases]} / {"alias": "Canonical"}; CSV: alias,canonical per row
+    if path.lower().endswith(".csv"):
+        aliases = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) >= 2 and row[0].strip() and not row[0].startswith("#"):
+                    aliases[row[0].strip()] = row[1].strip()
+        aliases.pop("alias", None)  # optional header row
+        return aliases
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def load_index(*paths, cache_size=65536):
+    index = SkillIndex(cache_size=cache_size)
+    for path in paths:
+        index.add(load_aliases(path))
+    return index
+
+_default_index = None
+
+def default_index():
+    # bundled table, plus SKILL_ALIASES=path1:path2 for site-specific extensions
+    global _default_index
+    if _default_index is None:
+        extra = [p for p in os.environ.get("SKILL_ALIASES", "").split(os.pathsep) if p]
+        _default_index = load_index(DEFAULT_ALIASES_PATH, *extra)
+    return _default_index
+
+def set_default_index(index):
+    global _default_index
+    _default_index = index
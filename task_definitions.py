@@ -0,0 +1,142 @@
+# task_definitions.py — the Julep task definitions main_code.py registers
+#
+# Kept apart from main_code.py (which talks to Julep at import time) so benchmarks and
+# tests can run the same definitions against fake_julep.FakeJulep.
+
+# ===================================
+# TASK A — EXTRACT EVIDENCE (LLM)
+# ===================================
+extract_task = {
+    "name": "extract_evidence_task",
+    "description": "Extract structured evidence from resumes",
+    "input_schema": {
+        "type": "object",
+        "required": ["resumes"],
+        "properties": {"resumes": {"type": "array"}}
+    },
+    "main": [
+        {
+            "prompt": [
+                {
+                    "role": "system",
+                    "content": (
+                        "Extract ONLY structured evidence from the resumes. "
+                        "Do not score. Do not invent facts.\n\n"
+                        "Return JSON with one key: evidence. "
+                        "Each item includes:\n"
+                        "- id: the resume's id, copied unchanged (omit it when the resume has none)\n"
+                        "- name: string\n"
+                        "- skills: array of strings\n"
+                        "- experience: array of objects with fields 'role' (string) and 'years' (number)\n"
+                        "- education: array of strings\n"
+                        "- projects: array of strings\n"
+                        "Some resumes carry a 'resolved' object with fields a keyword matcher already found; "
+                        "it can be wrong. Check resolved.skills against the resume text: list under "
+                        "rejected_skills every resolved skill the resume does not actually claim, and "
+                        "under skills only skills missing from resolved.skills. Leave experience empty "
+                        "when resolved.experience is given and correct.\n"
+                        "Return JSON ONLY."
+                    )
+                },
+                {"role": "user", "content": "$ f'''Resumes: {steps[0].input.resumes}'''"},
+            ],
+            "unwrap": True,
+            "save_as": "evidence_json",
+        },
+        {"return": {"evidence_json": "$ steps[0].output"}},
+    ],
+}
+
+# ==========================================================
+# TASK B — SCORE, QUESTIONS, DEDUPE (LLM + TOOLS); MERGE IS LOCAL
+# ==========================================================
+rank_task = {
+    "name": "rank_and_questions_task",
+    "description": "Score & rank via tool; draft questions; dedupe via tool.",
+    "tools": [
+        {
+            "name": "compute_scores",
+            "type": "function",
+            "function": {
+                "description": "Compute scores and ranking using criteria and extracted evidence.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "criteria": {"type": "object"},
+                        "evidence": {"type": "object"},
+                        "n": {"type": "integer", "minimum": 1}
+                    },
+                    "required": ["criteria", "evidence", "n"],
+                },
+            },
+        },
+        {
+            "name": "dedupe_questions",
+            "type": "function",
+            "function": {
+                "description": "Deduplicate and trim interview questions per candidate to 5.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "questions": {"type": "object"}
+                    },
+                    "required": ["questions"],
+                },
+            },
+        },
+    ],
+    "input_schema": {
+        "type": "object",
+        "required": ["criteria", "evidence_json", "n"],
+        "properties": {
+            "criteria": {"type": "object"},
+            "evidence_json": {"type": "string"},  # string from Task A
+            "n": {"type": "integer", "minimum": 1}
+        }
+    },
+    "main": [
+        # Step 0 — Call compute_scores (awaiting_input; resume from client)
+        {
+            "tool": "compute_scores",
+            "arguments": {
+                "criteria": "$ steps[0].input.criteria",
+                "evidence": "$ steps[0].input.evidence_json",
+                "n": "$ steps[0].input.n",
+            },
+            "save_as": "scored",
+        },
+
+        # Step 1 — Draft tailored questions (InterviewerAgent style via instructions in content)
+        {
+            "prompt": [
+                {
+                    "role": "system",
+                    "content": (
+                        "You are InterviewerAgent. Write tailored interview questions tied to each candidate's background. "
+                        "Ask about specific technologies, projects, and experience they actually have. Be concrete. "
+                        "Return JSON ONLY with key top_n_questions (an array of objects; each object has fields 'name' (string) and 'questions' (array of strings))."
+
+                    )
+                },
+                # top-N candidates only: score, rationale and trimmed evidence (compaction.py)
+                {"role": "user", "content": "Top candidates (score, rationale, evidence):"},
+                {"role": "user", "content": "$ f'''{steps[0].output.evidence_compact}'''"},
+            ],
+            "unwrap": True,
+            "save_as": "questions_json",
+        },
+
+        # Step 2 — Dedupe/clean questions via tool (awaiting_input; resume from client)
+        {
+            "tool": "dedupe_questions",
+            "arguments": {
+                "questions": "$ steps[1].output"
+            },
+            "save_as": "questions_clean",
+        },
+
+        # Step 3 — Return the tool outputs; the final RecruitmentResult is merged and
+        # schema-checked locally (scheduler.build_result), no second LLM round-trip
+        {"return": {"scored": "$ steps[0].output", "questions_clean": "$ steps[2].output"}},
+    ],
+}
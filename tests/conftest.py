@@ -0,0 +1,4 @@
+# tests import the flat modules from the repository root
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
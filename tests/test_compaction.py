@@ -0,0 +1,26 @@
+# test_compaction.py — compaction.compact_evidence on full and top-only scoring payloads
+from compaction import compact_evidence
+from local_tools import compute_scores_locally
+from ranking import RankingStore
+
+CRITERIA = {"must_haves": ["Python"], "nice_to_haves": ["AWS"]}
+EVIDENCE = [
+    {"id": "a", "name": "Sam Lee", "skills": ["Python", "AWS"], "experience": [{"role": "backend", "years": 5}]},
+    {"id": "b", "name": "Sam Lee", "skills": ["Python", "Django"], "experience": []},
+] + [{"id": f"p{i}", "name": f"Pat {i}", "skills": ["Go"], "experience": []} for i in range(100)]
+
+def test_same_name_candidates_keep_their_own_evidence():
+    scored = compute_scores_locally(CRITERIA, {"evidence": EVIDENCE}, 2)
+    text, _ = compact_evidence(EVIDENCE, scored)
+    first, second = text.split("\nSam Lee")
+    assert "AWS" in first and "Django" not in first
+    assert "Django" in second and "AWS" not in second
+
+def test_top_only_payload_counts_the_old_full_payload():
+    full = compute_scores_locally(CRITERIA, {"evidence": EVIDENCE}, 2)
+    top = compute_scores_locally(CRITERIA, {"evidence": EVIDENCE}, 2, top_only=True, store=RankingStore())
+    text_full, stats_full = compact_evidence(EVIDENCE, full)
+    text_top, stats_top = compact_evidence(EVIDENCE, top)
+    assert text_top == text_full
+    # the top-only ranking is scaled to the pool size, so both baselines agree closely
+    assert abs(stats_top["tokens_before"] - stats_full["tokens_before"]) < 0.05 * stats_full["tokens_before"]
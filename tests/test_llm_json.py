@@ -0,0 +1,40 @@
+# test_llm_json.py — llm_json repair paths: fences, truncation, numeric strings, nameless items
+from llm_json import close_json, parse_evidence, parse_llm_json
+
+ITEM = '{"name": "Ann", "skills": ["Python"], "experience": [{"role": "backend", "years": 4}]}'
+
+def test_code_fence_and_prose_are_stripped():
+    obj, notes = parse_llm_json('Here you go:\n```json\n{"evidence": [' + ITEM + ']}\n```\nThanks!')
+    assert obj["evidence"][0]["name"] == "Ann"
+    assert notes == ["stripped text around the JSON"]
+
+def test_clean_json_has_no_notes():
+    assert parse_llm_json('{"evidence": []}') == ({"evidence": []}, [])
+
+def test_truncation_is_closed_at_the_last_complete_element():
+    cut = '{"evidence": [' + ITEM + ', {"name": "Bob", "skills": ["Ja'
+    fixed, complete = close_json(cut)
+    assert not complete
+    assert fixed == '{"evidence": [' + ITEM + ', {"name": "Bob", "skills": []}]}'
+    items, problems = parse_evidence(cut)
+    assert [i["name"] for i in items] == ["Ann", "Bob"]
+    assert items[1]["skills"] == []
+    assert "repaired truncated JSON" in problems
+
+def test_close_json_gives_up_without_any_value():
+    assert close_json('"just a string') == (None, False)
+
+def test_numeric_strings_are_coerced():
+    raw = '{"evidence": [{"name": "Ann", "experience": [{"role": "backend", "years": " 2.5 "}, {"role": "ops", "years": "many"}]}]}'
+    items, problems = parse_evidence(raw)
+    assert items[0]["experience"] == [{"role": "backend", "years": 2.5}, {"role": "ops"}]
+    assert len(problems) == 1 and problems[0].startswith("$.evidence[0].experience[1].years")
+
+def test_nameless_items_are_dropped_and_reported():
+    raw = '{"evidence": [{"skills": ["Go"]}, ' + ITEM + ', {"name": 7}]}'
+    items, problems = parse_evidence(raw)
+    assert [i["name"] for i in items] == ["Ann"]
+    assert problems == [
+        "$.evidence[0]: missing required field 'name'",
+        "$.evidence[2]: missing required field 'name'",
+    ]
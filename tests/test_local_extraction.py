@@ -0,0 +1,20 @@
+# test_local_extraction.py — SkillMatcher word aliases and Task A's say over resolved skills
+from local_extraction import LocalExtractor, SkillMatcher
+
+def test_word_aliases_ignored_in_prose():
+    prose = "We rest on weekends; next, express your spark in a shell script at Oracle on the Nest team."
+    assert SkillMatcher().find(prose) == []
+
+def test_word_aliases_count_as_list_entries():
+    found = SkillMatcher().find("Skills: Python, Spark, Express, Shell and REST")
+    assert found == ["Python", "Apache Spark", "Express", "Bash", "REST"]
+
+def test_rejected_skills_are_dropped_on_merge():
+    local = LocalExtractor()
+    resumes = list(local.annotate([{"name": "Ann", "text": "Python, Spark, 4y backend"}]))
+    assert resumes[0]["resolved"]["skills"] == ["Python", "Apache Spark"]
+    items = [{"id": resumes[0]["id"], "name": "Ann", "skills": ["Kafka"], "rejected_skills": ["Apache Spark"]}]
+    merged, misses = local.merge(resumes, items)
+    assert misses == []
+    assert merged[0]["skills"] == ["Python", "Kafka"]
+    assert "rejected_skills" not in merged[0]
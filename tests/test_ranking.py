@@ -0,0 +1,39 @@
+# test_ranking.py — lifetime of ranking.RankingStore cursors
+import time
+
+import pytest
+
+from ranking import RankingStore
+
+def entries(count, base=0):
+    return [{"name": f"C{base + i}", "score": i / 100} for i in range(count)]
+
+def test_cursor_outlives_other_rankings():
+    store = RankingStore()
+    cursor = store.put(entries(5), offset=2)
+    for k in range(100):  # other requisitions scoring meanwhile
+        store.put(entries(5, base=100 * k), offset=2)
+    page = store.page(cursor, limit=2)
+    assert [r["name"] for r in page["ranked"]] == ["C2", "C1"]
+    assert page["next_cursor"] is not None
+
+def test_ranking_dropped_when_paged_to_the_end():
+    store = RankingStore()
+    cursor = store.put(entries(4), offset=1)
+    page = store.page(cursor, limit=10)
+    assert page["total"] == 4 and page["next_cursor"] is None
+    assert len(store) == 0
+    with pytest.raises(KeyError):
+        store.page(cursor)
+
+def test_drop_and_ttl():
+    store = RankingStore(ttl=0.05)
+    kept = store.put(entries(3), offset=1)
+    store.drop(kept)
+    assert len(store) == 0
+    stale = store.put(entries(3), offset=1)
+    time.sleep(0.1)
+    store.put(entries(3), offset=1)  # expiry runs on put
+    with pytest.raises(KeyError):
+        store.page(stale)
+    assert len(store) == 1
@@ -0,0 +1,17 @@
+# test_registry.py — registry.Registry reuse and in-place updates on fake_julep.FakeJulep
+from dispatch import task_steps
+from fake_julep import FakeJulep
+from registry import Registry
+from task_definitions import rank_task
+
+def test_update_in_place_refreshes_cached_steps():
+    client = FakeJulep()
+    registry = Registry(client, cache_path=None)
+    agent_id = registry.agent("OrchestratorAgent").id
+    task = registry.task(agent_id, rank_task)
+    assert [s.get("save_as") for s in task_steps(client, task.id)] == ["scored", "questions_json", "questions_clean", None]
+
+    changed = dict(rank_task, main=rank_task["main"][:1] + rank_task["main"][-1:])
+    updated = registry.task(agent_id, changed)
+    assert updated.id == task.id and updated.reused == "updated"
+    assert [s.get("save_as") for s in task_steps(client, task.id)] == ["scored", None]
@@ -0,0 +1,101 @@
+# test_scheduler.py — ExecutionScheduler.run_requisitions end to end on fake_julep.FakeJulep
+from fake_julep import FakeJulep, fake_extract
+from ranking import RankingStore
+from registry import Registry
+from scheduler import ExecutionScheduler
+from task_definitions import extract_task, rank_task
+from waiting import WaitStrategy
+
+CRITERIA = {
+    "role": "Senior Backend Engineer",
+    "must_haves": ["Python", "PostgreSQL"],
+    "nice_to_haves": ["AWS"],
+    "weights": {"must_haves": 0.6, "nice_to_haves": 0.2, "experience": 0.2},
+    "disqualifiers": [],
+}
+RESUMES = [
+    {"name": "Alice Smith", "text": "Python, PostgreSQL, 5y backend, AWS"},
+    {"name": "Bob Lee", "text": "Java, Spring, MySQL, 3y backend"},
+    {"name": "Carmen Diaz", "text": "Python, Postgres, 7y backend, AWS"},
+]
+
+def run(requisitions, ranking_store=None, **backend):
+    client = FakeJulep(**backend)
+    registry = Registry(client, cache_path=None)
+    extract_id = registry.task(registry.agent("ExtractorAgent").id, extract_task).id
+    rank_id = registry.task(registry.agent("OrchestratorAgent").id, rank_task).id
+    wait = WaitStrategy(initial=0.001, cap=0.005, fast_interval=0.001, jitter=0.0)
+    with ExecutionScheduler(client, max_concurrency=4, wait_strategy=wait, ranking_store=ranking_store,
+                            log=lambda *a: None) as scheduler:
+        results = dict(scheduler.run_requisitions(extract_id, rank_id, requisitions))
+    return client, results
+
+def top_names(res, n=2):
+    return [r["name"] for r in res["result"]["ranked"][:n]]
+
+def test_requisitions_finish_through_pauses():
+    reqs = [{"criteria": CRITERIA, "resumes": RESUMES, "n": 2} for _ in range(2)]
+    client, results = run(reqs, pauses={"questions_json": 2})
+
+    assert sorted(results) == [0, 1]
+    for res in results.values():
+        assert res["error"] is None
+        assert res["rank"].status == "succeeded"
+        assert top_names(res) == ["Carmen Diaz", "Alice Smith"]
+        assert [q["name"] for q in res["result"]["top_n_questions"]] == ["Carmen Diaz", "Alice Smith"]
+        assert res["validation_errors"] == []
+        assert res["started"] is not None
+    # every Task B sat out both scripted pauses, then resumed compute_scores and
+    # dedupe_questions once each
+    rank_exes = [e for e in client.executions.items.values() if e.task.name == rank_task["name"]]
+    assert len(rank_exes) == 2 and all(e.pauses["questions_json"] == 0 for e in rank_exes)
+    assert client.calls["executions.change_status"] == 4
+
+def test_failed_step_fails_only_its_requisition():
+    def extract(ctx):
+        if any(r["name"] == "Mallory" for r in ctx["input"]["resumes"]):
+            raise RuntimeError("model overloaded")
+        return fake_extract(ctx)
+
+    reqs = [
+        {"criteria": CRITERIA, "resumes": RESUMES, "n": 2},
+        {"criteria": CRITERIA, "resumes": [{"name": "Mallory", "text": "Python, 1y backend"}], "n": 1},
+    ]
+    _, results = run(reqs, responders={"evidence_json": extract})
+
+    assert results[0]["error"] is None
+    assert top_names(results[0]) == ["Carmen Diaz", "Alice Smith"]
+    assert results[1]["error"] == "Task A failed"
+    assert results[1]["rank"] is None and results[1]["result"] is None
+    assert "model overloaded" in results[1]["extract"].error
+
+def test_merge_failure_fails_only_its_requisition():
+    class LosingStore(RankingStore):
+        # the first requisition to merge finds its ranking gone
+        lost = False
+
+        def page(self, cursor, limit=50):
+            if not self.lost:
+                self.lost = True
+                raise KeyError(f"unknown or expired ranking cursor {cursor!r}")
+            return super().page(cursor, limit)
+
+    store = LosingStore()
+    reqs = [{"criteria": CRITERIA, "resumes": RESUMES, "n": 1} for _ in range(3)]
+    _, results = run(reqs, ranking_store=store)
+
+    errors = [res["error"] for res in results.values() if res["error"]]
+    assert len(results) == 3 and len(errors) == 1 and errors[0].startswith("merge raised KeyError")
+    for res in results.values():
+        if res["error"] is None:
+            assert len(res["result"]["ranked"]) == 3  # top-1 plus the paged remainder
+    assert len(store) == 0  # merged or not, every ranking was dropped
+
+def test_pause_on_a_prompt_step_is_waited_out():
+    # Task A has no tools: its pause is logged as "no tool step pending" until it resumes
+    reqs = [{"criteria": CRITERIA, "resumes": RESUMES, "n": 2}]
+    client, results = run(reqs, pauses={"evidence_json": 1})
+
+    assert results[0]["error"] is None
+    assert results[0]["extract"].status == "succeeded"
+    assert top_names(results[0]) == ["Carmen Diaz", "Alice Smith"]
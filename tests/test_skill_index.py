@@ -0,0 +1,47 @@
+# test_skill_index.py — lookup tiers of skill_index.SkillIndex
+import pytest
+
+from skill_index import SkillIndex
+
+ALIASES = {
+    "Elasticsearch": ["elasticsearch", "es"],
+    "Python": ["python", "py"],
+    "Node.js": ["node", "nodejs", "node.js"],
+    "PostgreSQL": ["postgres", "postgresql"],
+    "Go": ["go", "golang"],
+    "Amazon S3": ["s3"],
+}
+
+@pytest.fixture
+def index():
+    return SkillIndex(ALIASES)
+
+@pytest.mark.parametrize("raw, canonical", [
+    ("postgres", "PostgreSQL"),
+    ("Node JS", "Node.js"),
+    ("Postgres 14", "PostgreSQL"),
+    ("S3", "Amazon S3"),
+])
+def test_alias_tiers(index, raw, canonical):
+    assert index.lookup(raw) == canonical
+
+@pytest.mark.parametrize("raw, canonical", [
+    ("python3.11", "Python"),   # dotted
+    ("go1.21", "Go"),           # dotted, short name
+    ("node-18", "Node.js"),     # after a separator
+    ("py_3", "Python"),
+    ("python3", "Python"),      # 3+ char name
+    ("postgres14", "PostgreSQL"),
+    ("python3.x", "Python"),
+])
+def test_trailing_version_stripped(index, raw, canonical):
+    assert index.lookup(raw) == canonical
+
+@pytest.mark.parametrize("raw", ["ES2015", "es6", "py3", "s4", "go2"])
+def test_digits_glued_to_short_name_are_not_a_version(index, raw):
+    # "es" + "2015" is ECMAScript, not Elasticsearch 2015
+    assert index.lookup(raw) is None
+
+def test_normalize_keeps_unknown_terms(index):
+    assert index.normalize("ES2015") == "ES2015"
+    assert index.normalize("python3.11") == "Python"
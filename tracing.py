@@ -0,0 +1,171 @@
+# tracing.py — where a requisition's wall time goes, as OpenTelemetry-shaped spans
+#
+# One trace per requisition (or per standalone execution). drive_execution opens an
+# "execution" span and, inside it, one span per observed status phase ("status.running"
+# is the LLM working, "status.awaiting_input" is the pause until our tool answers),
+# one per tool handler ("tool.compute_scores", with compute_scores_locally etc. nested)
+# and one per resume call. Execution spans carry API call counts, time spent inside
+# executions.get and sleeping between polls, and payload sizes in bytes.
+# export() appends one OTLP/JSON document per run to a file (JSON lines), so runs can be
+# concatenated and aggregated; summary() gives per-span-name totals for the console.
+import json, math, os, secrets, threading, time
+from contextlib import contextmanager
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attrs", "error", "_tracer")
+
+    def __init__(self, tracer, name, trace_id, parent_id, attrs):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = tracer.clock()
+        self.end_ns = None
+        self.attrs = dict(attrs)
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key, value=1):
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def end(self, error=None):
+        if self.end_ns is None:
+            self.end_ns = self._tracer.clock()
+            self.error = error
+            self._tracer._finish(self)
+
+    @property
+    def seconds(self):
+        end = self.end_ns if self.end_ns is not None else self._tracer.clock()
+        return (end - self.start_ns) / 1e9
+
+def _otlp_value(v):
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+def payload_bytes(obj):
+    if obj is None:
+        return 0
+    if isinstance(obj, str):
+        return len(obj.encode("utf-8"))
+    return len(json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8"))
+
+class Tracer:
+    enabled = True
+
+    def __init__(self, service="recruitment-assistant", clock=time.time_ns):
+        self.service = service
+        self.clock = clock
+        self.spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def start(self, name, parent=None, **attrs):
+        # a span that is not made current; pass it as `parent` across threads
+        parent = parent or self.current()
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        return Span(self, name, trace_id, parent.span_id if parent else None, attrs)
+
+    @contextmanager
+    def span(self, name, parent=None, **attrs):
+        span = self.start(name, parent, **attrs)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.end(error=repr(e))
+            raise
+        finally:
+            stack.pop()
+            span.end()
+
+    def _finish(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_otlp(self):
+        with self._lock:
+            spans = list(self.spans)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service}}]},
+            "scopeSpans": [{
+                "scope": {"name": "tracing"},
+                "spans": [{
+                    "traceId": s.trace_id,
+                    "spanId": s.span_id,
+                    "parentSpanId": s.parent_id or "",
+                    "name": s.name,
+                    "kind": 1,  # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": str(s.start_ns),
+                    "endTimeUnixNano": str(s.end_ns),
+                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in sorted(s.attrs.items())],
+                    "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                } for s in spans],
+            }],
+        }]}
+
+    def export(self, path):
+        # appends one OTLP/JSON document (a single line) per call
+        line = json.dumps(self.to_otlp(), separators=(",", ":"), ensure_ascii=False)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def summary(self):
+        # span name -> {"count", "total_s", "p50_s", "p95_s", "max_s"}
+        with self._lock:
+            spans = list(self.spans)
+        by_name = {}
+        for s in spans:
+            by_name.setdefault(s.name, []).append((s.end_ns - s.start_ns) / 1e9)
+        def pct(xs, p):
+            return xs[min(len(xs) - 1, math.ceil(p * len(xs)) - 1)]
+        out = {}
+        for name, xs in sorted(by_name.items()):
+            xs.sort()
+            out[name] = {
+                "count": len(xs), "total_s": round(sum(xs), 6),
+                "p50_s": round(pct(xs, 0.5), 6), "p95_s": round(pct(xs, 0.95), 6), "max_s": round(xs[-1], 6),
+            }
+        return out
+
+class NullTracer(Tracer):
+    # same interface, keeps nothing; payload sizes are skipped when tracing is off
+    enabled = False
+
+    def _finish(self, span):
+        pass
+
+NULL_TRACER = NullTracer()
+
+def load_traces(path):
+    # -> every span dict from an export() file, across all runs appended to it
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                for rs in json.loads(line)["resourceSpans"]:
+                    for ss in rs["scopeSpans"]:
+                        spans.extend(ss["spans"])
+    return spans
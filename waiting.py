@@ -0,0 +1,154 @@
+# waiting.py — how long to wait between executions.get polls
+#
+# WaitStrategy is shared by every execution; each execution gets its own Waiter:
+#   waiter.observed(exe)  after every executions.get (counts polls, spots status changes)
+#   waiter.resumed()      after change_status, opens a fast-poll window
+#   waiter.wait()         sleeps the next delay, or returns early if a notifier fires
+import math, random, threading, time
+from datetime import datetime
+
+class PushNotifier:
+    # Hook for push/webhook delivery: whatever receives the backend's callback calls
+    # notify(execution_id) and the matching waiter wakes up immediately.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = {}
+
+    def _event(self, execution_id):
+        with self._lock:
+            return self._events.setdefault(execution_id, threading.Event())
+
+    def notify(self, execution_id):
+        self._event(execution_id).set()
+
+    def wait(self, execution_id, timeout):
+        event = self._event(execution_id)
+        fired = event.wait(timeout)
+        event.clear()
+        return fired
+
+    def forget(self, execution_id):
+        with self._lock:
+            self._events.pop(execution_id, None)
+
+class WaitMetrics:
+    # polls per execution and detection lag (status change -> we notice it). Lag uses the
+    # execution's updated_at when the backend provides one, otherwise the time since the
+    # previous poll, which is an upper bound.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.polls = {}
+        self.lags = []
+
+    def record_poll(self, execution_id):
+        with self._lock:
+            self.polls[execution_id] = self.polls.get(execution_id, 0) + 1
+
+    def record_lag(self, seconds):
+        with self._lock:
+            self.lags.append(max(0.0, seconds))
+
+    def summary(self):
+        with self._lock:
+            polls = sorted(self.polls.values())
+            lags = sorted(self.lags)
+        def pct(xs, p):
+            return xs[min(len(xs) - 1, math.ceil(p * len(xs)) - 1)] if xs else 0.0
+        return {
+            "executions": len(polls),
+            "polls_total": sum(polls),
+            "polls_per_execution": sum(polls) / len(polls) if polls else 0.0,
+            "polls_max": polls[-1] if polls else 0,
+            "status_changes": len(lags),
+            "detect_lag_mean_s": sum(lags) / len(lags) if lags else 0.0,
+            "detect_lag_p95_s": pct(lags, 0.95),
+            "detect_lag_max_s": lags[-1] if lags else 0.0,
+        }
+
+def _timestamp(value):
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+class WaitStrategy:
+    # Exponential backoff with jitter, capped; resets whenever the status changes.
+    # Right after a tool pause is resumed we poll every fast_interval for fast_window
+    # seconds, since the next step often finishes (or pauses again) quickly.
+    def __init__(self, initial=0.25, factor=2.0, cap=5.0, jitter=0.2,
+                 fast_interval=0.1, fast_window=2.0, notifier=None,
+                 sleep=time.sleep, clock=time.monotonic, rng=random.random):
+        self.initial = initial
+        self.factor = factor
+        self.cap = cap
+        self.jitter = jitter
+        self.fast_interval = fast_interval
+        self.fast_window = fast_window
+        self.notifier = notifier
+        self.sleep = sleep
+        self.clock = clock
+        self.rng = rng
+
+    def waiter(self, execution_id, metrics=None):
+        return Waiter(self, execution_id, metrics)
+
+def fixed_interval(seconds=1.0, **kw):
+    # the original behaviour: sleep exactly `seconds` between polls
+    return WaitStrategy(initial=seconds, factor=1.0, cap=seconds, jitter=0.0, fast_window=0.0, **kw)
+
+class Waiter:
+    def __init__(self, strategy, execution_id, metrics=None):
+        self.s = strategy
+        self.execution_id = execution_id
+        self.metrics = metrics
+        self.attempt = 0
+        self.status = None
+        self.fast_until = 0.0
+        self.last_poll = None
+
+    def observed(self, exe):
+        now = self.s.clock()
+        status = getattr(exe, "status", None)
+        if self.metrics is not None:
+            self.metrics.record_poll(self.execution_id)
+            if self.status is not None and status != self.status:
+                changed_at = _timestamp(getattr(exe, "updated_at", None))
+                if changed_at is not None:
+                    self.metrics.record_lag(time.time() - changed_at)
+                elif self.last_poll is not None:
+                    self.metrics.record_lag(now - self.last_poll)
+        if status != self.status:
+            self.attempt = 0
+        self.status = status
+        self.last_poll = now
+
+    def resumed(self):
+        self.attempt = 0
+        self.fast_until = self.s.clock() + self.s.fast_window
+
+    def next_delay(self):
+        s = self.s
+        if self.s.clock() < self.fast_until:
+            return s.fast_interval
+        delay = min(s.cap, s.initial * (s.factor ** self.attempt))
+        if delay < s.cap:
+            self.attempt += 1
+        # jitter only ever shortens the delay so the cap stays a hard ceiling
+        return delay * (1.0 - s.jitter * s.rng())
+
+    def wait(self):
+        delay = self.next_delay()
+        if self.s.notifier is not None:
+            self.s.notifier.wait(self.execution_id, delay)
+        else:
+            self.s.sleep(delay)
+
+    def done(self):
+        if self.s.notifier is not None:
+            self.s.notifier.forget(self.execution_id)